@@ -0,0 +1,113 @@
+import csv
+import json
+import sys
+
+import degrees
+from graph import CSRGraph
+
+
+def main():
+    if len(sys.argv) not in [3, 4]:
+        sys.exit("Usage: python batch.py directory pairs.csv [output.jsonl]")
+    directory = sys.argv[1]
+
+    print("Loading data...", file=sys.stderr)
+    graph = load_graph(directory)
+    print("Data loaded.", file=sys.stderr)
+
+    pairs = read_pairs(sys.argv[2])
+    output = open(sys.argv[3], "w", encoding="utf-8") if len(sys.argv) == 4 else sys.stdout
+    try:
+        for result in batch_queries(graph, pairs, degrees.components):
+            output.write(json.dumps(result) + "\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+def load_graph(directory):
+    """
+    Load the data in `directory` and return it as a `CSRGraph`,
+    reusing the snapshot graph when `load_data` memory-mapped one.
+    """
+    degrees.load_data(directory)
+    if degrees.graph is not None:
+        return degrees.graph
+    return CSRGraph.from_data(degrees.people, degrees.movies)
+
+
+def read_pairs(filename):
+    """
+    Return the (source, target) person_id pairs listed in a CSV file
+    with columns source, target.
+    """
+    with open(filename, encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        return [(row["source"], row["target"]) for row in reader]
+
+
+def group_by_source(pairs):
+    """
+    Return a dict mapping each source to the list of its targets,
+    in the order they first appear in `pairs`.
+    """
+    groups = {}
+    for source, target in pairs:
+        groups.setdefault(source, []).append(target)
+    return groups
+
+
+def batch_queries(graph, pairs, components=None):
+    """
+    Answer every (source, target) pair on `graph`, running a single
+    breadth-first search per distinct source.
+
+    Yields one dict per pair, with keys source, target, degrees and path
+    (a list of [movie_id, person_id] pairs). Pairs that are not connected
+    have degrees and path set to None; unknown ids also have an error.
+    If a ComponentIndex is given, the search skips targets it proves unreachable.
+    """
+    for source, targets in group_by_source(pairs).items():
+        yield from query_source(graph, source, targets, components)
+
+
+def query_source(graph, source, targets, components=None):
+    """
+    Answer the queries from `source` to each of `targets` with one search tree.
+    """
+    if source not in graph.person_index:
+        for target in targets:
+            yield _result(source, target, None, error="unknown source")
+        return
+
+    # Unreachable targets would make the search exhaust the whole component
+    known = [
+        target for target in targets
+        if target in graph.person_index
+        and (components is None or components.connected(source, target))
+    ]
+    tree = graph.search(source, known)
+    for target in targets:
+        if target not in graph.person_index:
+            yield _result(source, target, None, error="unknown target")
+        else:
+            yield _result(source, target, tree.path(target))
+
+
+def _result(source, target, path, error=None):
+    """
+    Return the JSON-ready result of one query.
+    """
+    result = {
+        "source": source,
+        "target": target,
+        "degrees": None if path is None else len(path),
+        "path": None if path is None else [list(step) for step in path],
+    }
+    if error is not None:
+        result["error"] = error
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import random
+import sys
+import time
+
+from util import (Node, StackFrontier, QueueFrontier,
+                  DequeStackFrontier, DequeQueueFrontier, PriorityFrontier)
+
+# Frontier classes to compare, as name -> (class, legacy)
+FRONTIERS = {
+    "StackFrontier": (StackFrontier, True),
+    "QueueFrontier": (QueueFrontier, True),
+    "DequeStackFrontier": (DequeStackFrontier, False),
+    "DequeQueueFrontier": (DequeQueueFrontier, False),
+    "PriorityFrontier": (PriorityFrontier, False),
+}
+
+# The legacy classes are quadratic, so they only run on a smaller graph
+LEGACY_NODES = 10000
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python benchmark_frontier.py [nodes] [degree]")
+    nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    degree = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    print(f"Building synthetic graph ({nodes} nodes, degree {degree})...")
+    graph = synthetic_graph(nodes, degree)
+    legacy_graph = synthetic_graph(min(nodes, LEGACY_NODES), degree)
+
+    # Every class on the small graph, so legacy and new are compared on the same
+    # workload, then the new classes alone on the full graph
+    print(f"Every frontier on {len(legacy_graph)} nodes:")
+    for name, (frontier_class, _) in FRONTIERS.items():
+        report(name, legacy_graph, frontier_class)
+    if len(graph) > len(legacy_graph):
+        print(f"New frontiers on {len(graph)} nodes:")
+        for name, (frontier_class, legacy) in FRONTIERS.items():
+            if not legacy:
+                report(name, graph, frontier_class)
+
+
+def report(name, graph, frontier_class):
+    """
+    Search `graph` with `frontier_class` and print the nodes explored per second.
+    """
+    elapsed, explored = search(graph, frontier_class)
+    print(f"{name:>20}: {len(graph):>8} nodes, {explored:>8} explored, "
+          f"{elapsed:.3f}s ({explored / elapsed:,.0f} nodes/s)")
+
+
+def synthetic_graph(nodes, degree, seed=0):
+    """
+    Return a random undirected graph as a list of neighbor lists,
+    where every node has on average `degree` neighbors.
+    """
+    rng = random.Random(seed)
+    graph = [[] for _ in range(nodes)]
+    for _ in range(nodes * degree // 2):
+        a = rng.randrange(nodes)
+        b = rng.randrange(nodes)
+        graph[a].append(b)
+        graph[b].append(a)
+    return graph
+
+
+def search(graph, frontier_class):
+    """
+    Run a full graph search from node 0 with the given frontier class,
+    checking `contains_state` on every neighbor like `shortest_path` does.
+    Return the elapsed time and the number of nodes explored.
+    """
+    start_time = time.perf_counter()
+
+    frontier = frontier_class()
+    frontier.add(Node(state=0, parent=None, action=None))
+    explored = set()
+    while not frontier.empty():
+        node = frontier.remove()
+        explored.add(node.state)
+        for state in graph[node.state]:
+            if not frontier.contains_state(state) and state not in explored:
+                frontier.add(Node(state=state, parent=node, action=None))
+
+    return time.perf_counter() - start_time, len(explored)
+
+
+if __name__ == "__main__":
+    main()
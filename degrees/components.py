@@ -0,0 +1,68 @@
+import sys
+from collections import Counter
+
+import degrees
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python components.py [directory]")
+    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+
+    print("Loading data...")
+    degrees.load_data(directory)
+    print("Data loaded.")
+
+    people = degrees.people
+    movies = degrees.movies
+    sizes = component_sizes(degrees.components, people)
+    largest = sorted(sizes.values(), reverse=True)
+
+    print(f"People: {len(people)}")
+    print(f"Movies: {len(movies)}")
+    print(f"Components: {len(sizes)}")
+    print(f"Isolated people: {sum(1 for size in largest if size == 1)}")
+    print("Largest components:")
+    for size in largest[:10]:
+        print(f"  {size} ({size / len(people):.2%})")
+
+    histograms = {
+        "Movies per person": (len(person["movies"]) for person in people.values()),
+        "Stars per movie": (len(movie["stars"]) for movie in movies.values()),
+        "Co-stars per person": (len(costars(person_id)) for person_id in people),
+    }
+    for title, values in histograms.items():
+        print(f"{title}:")
+        for (low, high), count in sorted(histogram(values).items()):
+            print(f"  {low}-{high}: {count}")
+
+
+def component_sizes(index, people):
+    """
+    Return a Counter mapping each component root to its number of people.
+    """
+    return Counter(index.find(person_id) for person_id in people)
+
+
+def costars(person_id):
+    """
+    Return the set of other people who starred with `person_id`.
+    """
+    return {person for _, person in degrees.neighbors_for_person(person_id)} - {person_id}
+
+
+def histogram(values):
+    """
+    Return a Counter of `values` in power-of-two buckets,
+    keyed by the (low, high) bounds of each bucket.
+    """
+    buckets = Counter()
+    for value in values:
+        low = 0 if value == 0 else 1 << (value.bit_length() - 1)
+        high = max(0, 2 * low - 1)
+        buckets[(low, high)] += 1
+    return buckets
+
+
+if __name__ == "__main__":
+    main()
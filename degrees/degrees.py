@@ -1,7 +1,10 @@
 import csv
+import heapq
+import itertools
+import os
 import sys
 
-from util import Node, QueueFrontier
+from util import Node, DequeQueueFrontier, ComponentIndex
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,55 +15,189 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Compact CSRGraph of the data, set when it is loaded from a snapshot
+graph = None
 
-def load_data(directory):
+# ComponentIndex of the people, so unconnected pairs are answered without searching
+components = ComponentIndex()
+
+# Command line flags accepted by main
+FLAGS = {"--bidirectional", "--csr"}
+
+
+def load_data(directory, use_snapshot=True):
     """
     Load data from CSV files into memory.
+
+    If `directory` holds a snapshot (see snapshot.py) newer than the CSV files,
+    memory-map it instead, and set `graph` to the CSRGraph it is backed by.
+
+    Returns a LoadReport of the rows read.
     """
-    # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
-
-    # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
-
-    # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+    global names, people, movies, graph, components
+
+    if use_snapshot and os.path.isdir(os.path.join(directory, "snapshot")):
+        import snapshot
+        if snapshot.snapshot_is_fresh(directory):
+            names, people, movies, graph, components = snapshot.load_snapshot(directory)
+            return LoadReport()
+
+    # Start afresh, since ingest adds to the data already in memory
+    names, people, movies, graph = {}, {}, {}, None
+    components = ComponentIndex()
+    return ingest(directory)
+
+
+def ingest(directory, report=None):
+    """
+    Add the people.csv, movies.csv and stars.csv files found in `directory`
+    to the data already in memory, without reloading it.
+
+    Any of the files may be missing, so a directory holding only
+    a delta of new rows can be applied to a live process.
+    Returns the LoadReport, with the rows that were rejected.
+    """
+    if report is None:
+        report = LoadReport()
+
+    loaders = [("people.csv", add_people), ("movies.csv", add_movies), ("stars.csv", add_stars)]
+    for filename, loader in loaders:
+        path = os.path.join(directory, filename)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                loader(csv.DictReader(f), report, filename)
+    return report
+
+
+class LoadReport():
+    """
+    Counts of the rows added or updated by an ingestion,
+    and the rows it rejected together with the reason why.
+    """
+    def __init__(self):
+        self.added = {"people": 0, "movies": 0, "stars": 0}
+        self.updated = {"people": 0, "movies": 0}
+        self.rejected = []
+
+    def reject(self, source, row, reason):
+        self.rejected.append((source, dict(row), reason))
+
+    def __str__(self):
+        added = ", ".join(f"{count} {kind}" for kind, count in self.added.items())
+        updated = ", ".join(f"{count} {kind}" for kind, count in self.updated.items())
+        return f"Added {added}; updated {updated}; rejected {len(self.rejected)} rows."
+
+
+def add_people(rows, report, source="people"):
+    """
+    Add people from rows with fields id, name, birth.
+    A row for a known id replaces its name and birth, keeping its movies.
+    """
+    global graph
+    for row in rows:
+        if not row.get("id") or row.get("name") is None:
+            report.reject(source, row, "missing id or name")
+            continue
+
+        person = people.get(row["id"])
+        if person is None:
+            person = {"movies": set()}
+            report.added["people"] += 1
+        else:
+            # Drop the old name from the index before renaming
+            old = person["name"].lower()
+            names[old] = names[old] - {row["id"]}
+            if not names[old]:
+                del names[old]
+            report.updated["people"] += 1
+
+        person["name"] = row["name"]
+        person["birth"] = row.get("birth") or ""
+        people[row["id"]] = person
+        names[row["name"].lower()] = names.get(row["name"].lower(), set()) | {row["id"]}
+
+    # The compact graph no longer matches the data
+    graph = None
+
+
+def add_movies(rows, report, source="movies"):
+    """
+    Add movies from rows with fields id, title, year.
+    A row for a known id replaces its title and year, keeping its stars.
+    """
+    global graph
+    for row in rows:
+        if not row.get("id") or row.get("title") is None:
+            report.reject(source, row, "missing id or title")
+            continue
+
+        movie = movies.get(row["id"])
+        if movie is None:
+            movie = {"stars": set()}
+            report.added["movies"] += 1
+        else:
+            report.updated["movies"] += 1
+
+        movie["title"] = row["title"]
+        movie["year"] = row.get("year") or ""
+        movies[row["id"]] = movie
+    graph = None
+
+
+def add_stars(rows, report, source="stars"):
+    """
+    Add star edges from rows with fields person_id, movie_id.
+    Rows naming an unknown person or movie are rejected.
+    """
+    global graph
+    for row in rows:
+        person = people.get(row.get("person_id"))
+        movie = movies.get(row.get("movie_id"))
+        if person is None:
+            report.reject(source, row, "unknown person_id")
+            continue
+        if movie is None:
+            report.reject(source, row, "unknown movie_id")
+            continue
+
+        if row["movie_id"] in person["movies"]:
+            continue
+
+        # Every star of a movie is already in one component, so joining one is enough
+        for costar in movie["stars"]:
+            components.union(row["person_id"], costar)
+            break
+        person["movies"].add(row["movie_id"])
+        movie["stars"].add(row["person_id"])
+
+        # Store the records back, since snapshot-backed mappings build them on the fly
+        people[row["person_id"]] = person
+        movies[row["movie_id"]] = movie
+        report.added["stars"] += 1
+    graph = None
 
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    global graph
+
+    # Split optional flags from the positional directory argument
+    flags = [arg for arg in sys.argv[1:] if arg.startswith("--")]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    if len(args) > 1 or any(flag not in FLAGS for flag in flags):
+        sys.exit("Usage: python degrees.py [directory] [--bidirectional] [--csr]")
+    directory = args[0] if len(args) == 1 else "large"
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    report = load_data(directory)
     print("Data loaded.")
+    if report.rejected:
+        print(f"Skipped {len(report.rejected)} invalid rows.")
+
+    # Optionally build the compact integer-indexed graph to search on
+    if "--csr" in flags and graph is None:
+        from graph import CSRGraph
+        graph = CSRGraph.from_data(people, movies)
 
     source = person_id_for_name(input("Name: "))
     if source is None:
@@ -69,7 +206,12 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    if "--bidirectional" in flags:
+        explored = {}
+        path = bidirectional_shortest_path(source, target, explored, graph)
+        print(f"Explored {explored['source']} from source, {explored['target']} from target.")
+    else:
+        path = shortest_path(source, target, graph)
 
     if path is None:
         print("Not connected.")
@@ -84,13 +226,20 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, graph=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
+    If `graph` is given, the search runs on that `CSRGraph` instead.
+
     If no possible path, returns None.
     """
+    if not components.connected(source, target):
+        return None
+    if graph is not None:
+        return graph.shortest_path(source, target)
+
     # ! Solution inspired by the lesson code
 
     # Keep track of number of states explored
@@ -98,7 +247,7 @@ def shortest_path(source, target):
 
     # Initialize frontier to just the starting position
     start = Node(state=source, parent=None, action=None)
-    frontier = QueueFrontier()
+    frontier = DequeQueueFrontier()
     frontier.add(start)
 
     # Initialize an empty explored set
@@ -108,7 +257,7 @@ def shortest_path(source, target):
     while True:
         # If nothing left in frontier, then no path
         if frontier.empty():
-            raise Exception(None)
+            return None
 
         # Choose a node from the frontier
         node = frontier.remove()
@@ -133,6 +282,161 @@ def shortest_path(source, target):
                 frontier.add(child)
 
 
+def shortest_paths(source, target, score=None, graph=None):
+    """
+    Yields every shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, best ranked first.
+
+    A path ranks by the sum of `score(movie_id)` over its movies, highest
+    first; by default a movie scores its number of stars, as a measure of
+    popularity. Paths are generated lazily from a single breadth-first
+    search, so `itertools.islice(shortest_paths(...), k)` gives the top k.
+
+    If `graph` is given, neighbors are read from that `CSRGraph` instead.
+    """
+    if score is None:
+        score = movie_popularity
+    if not components.connected(source, target):
+        return
+    if source == target:
+        yield []
+        return
+
+    # Breadth-first levels, keeping every (movie, person) a person can be reached from
+    depth = {source: 0}
+    parents = {source: []}
+    level = [source]
+    while level and target not in depth:
+        next_level = []
+        for person_id in level:
+            for movie_id, neighbor in sorted(neighbors_for_person(person_id, graph)):
+                if neighbor not in depth:
+                    depth[neighbor] = depth[person_id] + 1
+                    parents[neighbor] = []
+                    next_level.append(neighbor)
+                if depth[neighbor] == depth[person_id] + 1:
+                    parents[neighbor].append((movie_id, person_id))
+        level = next_level
+    if target not in depth:
+        return
+
+    # Best score of any path from the source to each person
+    best = {source: 0}
+
+    def best_to(person_id):
+        if person_id not in best:
+            best[person_id] = max(
+                best_to(parent) + score(movie_id)
+                for movie_id, parent in parents[person_id]
+            )
+        return best[person_id]
+
+    # Extend partial paths backwards from the target; since `best_to` is exact,
+    # complete paths come off the heap in ranked order
+    counter = itertools.count()
+    heap = [(-best_to(target), next(counter), target, 0, ())]
+    while heap:
+        _, _, person_id, suffix, steps = heapq.heappop(heap)
+        if person_id == source:
+            yield list(steps)
+            continue
+        for movie_id, parent in parents[person_id]:
+            gained = suffix + score(movie_id)
+            heapq.heappush(heap, (
+                -(gained + best_to(parent)), next(counter),
+                parent, gained, ((movie_id, person_id),) + steps,
+            ))
+
+
+def movie_popularity(movie_id):
+    """
+    Returns the number of stars of a movie.
+    """
+    return len(movies[movie_id]["stars"])
+
+
+def bidirectional_shortest_path(source, target, explored=None, graph=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, growing one BFS frontier
+    from each end until they meet in the middle.
+
+    If `explored` is a dict, it is filled with the number of people
+    expanded from the "source" side and from the "target" side.
+
+    If `graph` is given, neighbors are read from that `CSRGraph` instead.
+
+    If no possible path, returns None.
+    """
+    if not components.connected(source, target):
+        if explored is not None:
+            explored.update({"source": 0, "target": 0})
+        return None
+
+    # Parents seen from the source side: person -> (movie, previous person)
+    forward = {source: None}
+    # Parents seen from the target side: person -> (movie, next person)
+    backward = {target: None}
+
+    forward_frontier = [source]
+    backward_frontier = [target]
+    counts = {"source": 0, "target": 0}
+
+    meeting = source if source == target else None
+    while meeting is None and forward_frontier and backward_frontier:
+        # Always expand the smaller frontier, so neither side explodes
+        if len(forward_frontier) <= len(backward_frontier):
+            side, parents, others, frontier = "source", forward, backward, forward_frontier
+        else:
+            side, parents, others, frontier = "target", backward, forward, backward_frontier
+
+        # Expand one whole BFS level. Each side holds everyone within its depth,
+        # with no one on both sides yet, so no path is shorter than the sum of
+        # the depths plus one, which is the length of the first meeting found
+        next_frontier = []
+        for person_id in frontier:
+            counts[side] += 1
+            for movie_id, neighbor in neighbors_for_person(person_id, graph):
+                if neighbor in parents:
+                    continue
+                parents[neighbor] = (movie_id, person_id)
+                next_frontier.append(neighbor)
+                if neighbor in others:
+                    meeting = neighbor
+                    break
+            if meeting is not None:
+                break
+
+        if side == "source":
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+
+    if explored is not None:
+        explored.update(counts)
+
+    if meeting is None:
+        return None
+
+    # Walk back from the meeting point to the source
+    path = []
+    person_id = meeting
+    while forward[person_id] is not None:
+        movie_id, previous = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = previous
+    path.reverse()
+
+    # Then walk forward from the meeting point to the target
+    person_id = meeting
+    while backward[person_id] is not None:
+        movie_id, following = backward[person_id]
+        path.append((movie_id, following))
+        person_id = following
+
+    return path
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
@@ -159,11 +463,15 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
-def neighbors_for_person(person_id):
+def neighbors_for_person(person_id, graph=None):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
+
+    If `graph` is given, the neighbors are read from that `CSRGraph` instead.
     """
+    if graph is not None:
+        return graph.neighbors_for_person(person_id)
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
@@ -0,0 +1,184 @@
+import numpy as np
+
+
+class CSRGraph():
+    """
+    Compact co-star graph.
+
+    Person and movie ids are interned to integers, and the person -> movies
+    and movie -> stars adjacency is stored as NumPy CSR arrays: the movies of
+    person `i` are `person_movies[person_indptr[i]:person_indptr[i + 1]]`,
+    and the stars of movie `j` are `movie_stars[movie_indptr[j]:movie_indptr[j + 1]]`.
+    """
+    def __init__(self, person_ids, movie_ids, person_indptr, person_movies,
+                 movie_indptr, movie_stars, person_index=None, movie_index=None):
+        self.person_ids = person_ids
+        self.movie_ids = movie_ids
+        self.person_indptr = person_indptr
+        self.person_movies = person_movies
+        self.movie_indptr = movie_indptr
+        self.movie_stars = movie_stars
+
+        # Maps string ids back to their integer index
+        if person_index is None:
+            person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        if movie_index is None:
+            movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+        self.person_index = person_index
+        self.movie_index = movie_index
+
+    @classmethod
+    def from_data(cls, people, movies):
+        """
+        Build a graph from the `people` and `movies` dicts filled by `load_data`.
+        """
+        person_ids = sorted(people)
+        movie_ids = sorted(movies)
+        person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+
+        person_indptr, person_movies = _csr(
+            person_ids, lambda person_id: people[person_id]["movies"], movie_index
+        )
+        movie_indptr, movie_stars = _csr(
+            movie_ids, lambda movie_id: movies[movie_id]["stars"], person_index
+        )
+        return cls(person_ids, movie_ids, person_indptr, person_movies,
+                   movie_indptr, movie_stars, person_index, movie_index)
+
+    def movies_for(self, person):
+        """
+        Return the integer ids of the movies of integer person `person`.
+        """
+        return self.person_movies[self.person_indptr[person]:self.person_indptr[person + 1]]
+
+    def stars_for(self, movie):
+        """
+        Return the integer ids of the stars of integer movie `movie`.
+        """
+        return self.movie_stars[self.movie_indptr[movie]:self.movie_indptr[movie + 1]]
+
+    def neighbors_for_person(self, person_id):
+        """
+        Returns (movie_id, person_id) pairs for people
+        who starred with a given person.
+        """
+        neighbors = set()
+        for movie in self.movies_for(self.person_index[person_id]).tolist():
+            movie_id = self.movie_ids[movie]
+            for person in self.stars_for(movie).tolist():
+                neighbors.add((movie_id, self.person_ids[person]))
+        return neighbors
+
+    def search(self, source, targets=None):
+        """
+        Run a breadth-first search from person id `source`.
+
+        The search expands a whole level at a time with array operations,
+        and stops early once every person id in `targets` has been reached.
+        Returns the resulting `SearchTree`.
+        """
+        tree = SearchTree(self, source)
+        remaining = None
+        if targets is not None:
+            remaining = np.array([self.person_index[target] for target in targets], dtype=np.int64)
+
+        frontier = np.array([tree.source], dtype=np.int64)
+        depth = 0
+        while len(frontier):
+            if remaining is not None:
+                remaining = remaining[tree.distance[remaining] < 0]
+                if len(remaining) == 0:
+                    break
+            depth += 1
+
+            # Movies of the frontier that no earlier level has gone through
+            owners, movies = _gather(self.person_indptr, self.person_movies, frontier)
+            fresh = tree.movie_parent[movies] < 0
+            movies, first = np.unique(movies[fresh], return_index=True)
+            tree.movie_parent[movies] = owners[fresh][first]
+
+            # People starring in those movies that have not been reached yet
+            owners, people = _gather(self.movie_indptr, self.movie_stars, movies)
+            fresh = tree.distance[people] < 0
+            people, first = np.unique(people[fresh], return_index=True)
+            tree.parent_movie[people] = owners[fresh][first]
+            tree.distance[people] = depth
+
+            frontier = people
+        return tree
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target.
+
+        If no possible path, returns None.
+        """
+        return self.search(source, [target]).path(target)
+
+
+class SearchTree():
+    """
+    Breadth-first search tree rooted at one person.
+
+    `distance[i]` is the degree of separation of person `i` (-1 if not reached),
+    `parent_movie[i]` is the movie through which `i` was reached, and
+    `movie_parent[j]` is the person through which movie `j` was reached.
+    """
+    def __init__(self, graph, source):
+        self.graph = graph
+        self.source = graph.person_index[source]
+        self.distance = np.full(len(graph.person_ids), -1, dtype=np.int32)
+        self.parent_movie = np.full(len(graph.person_ids), -1, dtype=np.int32)
+        self.movie_parent = np.full(len(graph.movie_ids), -1, dtype=np.int32)
+        self.distance[self.source] = 0
+
+    def degrees(self, target):
+        """
+        Return the degrees of separation of person id `target`, or None if not reached.
+        """
+        distance = int(self.distance[self.graph.person_index[target]])
+        return distance if distance >= 0 else None
+
+    def path(self, target):
+        """
+        Return the list of (movie_id, person_id) pairs from the root to
+        person id `target`, or None if the target was not reached.
+        """
+        person = self.graph.person_index[target]
+        if self.distance[person] < 0:
+            return None
+        path = []
+        while person != self.source:
+            movie = int(self.parent_movie[person])
+            path.append((self.graph.movie_ids[movie], self.graph.person_ids[person]))
+            person = int(self.movie_parent[movie])
+        path.reverse()
+        return path
+
+
+def _csr(keys, values_for, index):
+    """
+    Return the (indptr, indices) CSR arrays of the adjacency `values_for(key)`
+    for every key in `keys`, with values interned through `index`.
+    """
+    indptr = np.zeros(len(keys) + 1, dtype=np.int64)
+    indices = []
+    for i, key in enumerate(keys):
+        values = sorted(index[value] for value in values_for(key) if value in index)
+        indices.extend(values)
+        indptr[i + 1] = len(indices)
+    return indptr, np.array(indices, dtype=np.int32)
+
+
+def _gather(indptr, indices, rows):
+    """
+    Return the concatenated CSR rows `rows`, together with
+    the row each returned value came from.
+    """
+    starts = indptr[rows]
+    counts = indptr[rows + 1] - starts
+    owners = np.repeat(rows, counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owners, indices[np.repeat(starts, counts) + offsets]
@@ -0,0 +1,205 @@
+import heapq
+import itertools
+import math
+import sys
+import time
+
+import numpy as np
+
+import batch
+import degrees
+
+# Number of landmarks chosen by default
+LANDMARKS = 16
+
+
+def main():
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python landmarks.py directory [landmarks]")
+    k = int(sys.argv[2]) if len(sys.argv) == 3 else LANDMARKS
+
+    print("Loading data...")
+    graph = batch.load_graph(sys.argv[1])
+    print("Data loaded.")
+    print(f"Building index on {k} landmarks...")
+    index = LandmarkIndex.build(graph, k)
+    print("Index built.")
+
+    source = degrees.person_id_for_name(input("Name: "))
+    if source is None:
+        sys.exit("Person not found.")
+    target = degrees.person_id_for_name(input("Name: "))
+    if target is None:
+        sys.exit("Person not found.")
+
+    start = time.perf_counter()
+    lower, upper = index.bounds(source, target)
+    elapsed = (time.perf_counter() - start) * 1e6
+    print(f"Between {lower} and {upper} degrees of separation ({elapsed:.0f} us).")
+
+    path = index.shortest_path(source, target)
+    if path is None:
+        print("Not connected.")
+    else:
+        print(f"{len(path)} degrees of separation.")
+
+
+class LandmarkIndex():
+    """
+    Distance oracle over a `CSRGraph`.
+
+    `distances[l, i]` is the degree of separation between landmark `l`
+    and person `i`, or -1 if they are not connected. By the triangle
+    inequality, every landmark gives a lower and an upper bound on the
+    degrees of separation between any two people it reaches.
+    """
+    def __init__(self, graph, landmarks, distances):
+        self.graph = graph
+        self.landmarks = landmarks
+        self.distances = distances
+
+    @classmethod
+    def build(cls, graph, k=LANDMARKS):
+        """
+        Choose the `k` people with the most co-star links as landmarks,
+        and store the breadth-first distances from each of them.
+        """
+        # Co-star links of a person: the cast sizes of their movies (counting repeats)
+        cast = np.diff(graph.movie_indptr)
+        links = np.add.reduceat(
+            np.append(cast[graph.person_movies], 0),
+            graph.person_indptr[:-1],
+        )
+        links[np.diff(graph.person_indptr) == 0] = 0
+        landmarks = np.argsort(-links, kind="stable")[:k]
+
+        distances = np.empty((len(landmarks), len(graph.person_ids)), dtype=np.int16)
+        for row, landmark in enumerate(landmarks):
+            distances[row] = graph.search(graph.person_ids[int(landmark)]).distance
+        return cls(graph, landmarks, distances)
+
+    @classmethod
+    def load(cls, filename, graph):
+        """
+        Load an index saved with `save` for the same `graph`.
+        """
+        with np.load(filename) as data:
+            return cls(graph, data["landmarks"], data["distances"])
+
+    def save(self, filename):
+        """
+        Save the landmarks and their distances to a .npz file.
+        """
+        np.savez(filename, landmarks=self.landmarks, distances=self.distances)
+
+    def bounds(self, source, target):
+        """
+        Return (lower, upper) bounds on the degrees of separation between
+        person ids `source` and `target`.
+
+        The upper bound is math.inf when no landmark reaches both people,
+        and both bounds are math.inf when a landmark proves they are not connected.
+        """
+        s = self.graph.person_index[source]
+        t = self.graph.person_index[target]
+        return self._bounds(self.distances[:, s], self.distances[:, t], s == t)
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target.
+
+        Runs an A* search guided by the landmark lower bounds, pruning
+        every person whose bound exceeds the landmark upper bound.
+
+        If no possible path, returns None.
+        """
+        graph = self.graph
+        s = graph.person_index[source]
+        t = graph.person_index[target]
+        to_target = self.distances[:, t]
+
+        lower, upper = self._bounds(self.distances[:, s], to_target, s == t)
+        if lower == math.inf:
+            return None
+
+        # Heap of (estimate, -cost, tiebreak, person); deeper people first on ties
+        counter = itertools.count()
+        frontier = [(lower, 0, next(counter), s)]
+        cost = {s: 0}
+        parent = {s: None}
+        closed = set()
+
+        while frontier:
+            _, negative, _, person = heapq.heappop(frontier)
+            if person in closed:
+                continue
+            if person == t:
+                return self._path(parent, t)
+            closed.add(person)
+            g = -negative + 1
+
+            # Collect the people reachable through each movie that improve on their cost
+            candidates = []
+            for movie in graph.movies_for(person).tolist():
+                for neighbor in graph.stars_for(movie).tolist():
+                    if neighbor not in closed and g < cost.get(neighbor, math.inf):
+                        cost[neighbor] = g
+                        parent[neighbor] = (movie, person)
+                        candidates.append(neighbor)
+            if not candidates:
+                continue
+
+            # Bound the remaining distance of all candidates at once
+            estimates = self._lower_bounds(np.array(candidates), to_target)
+            for neighbor, estimate in zip(candidates, estimates.tolist()):
+                if g + estimate <= upper:
+                    heapq.heappush(frontier, (g + estimate, -g, next(counter), neighbor))
+        return None
+
+    def _lower_bounds(self, people, to_target):
+        """
+        Return the landmark lower bound on the distance from each of `people`
+        to the target whose landmark distances are `to_target`.
+        """
+        from_people = self.distances[:, people].astype(np.int32)
+        target = to_target.astype(np.int32)[:, None]
+        reached = (from_people >= 0) & (target >= 0)
+        bounds = np.where(reached, np.abs(from_people - target), 0).max(axis=0, initial=0)
+
+        # A landmark reaching exactly one side proves there is no path
+        apart = ((from_people >= 0) != (target >= 0)).any(axis=0)
+        return np.where(apart, np.inf, bounds)
+
+    def _bounds(self, from_source, to_target, same):
+        """
+        Return the (lower, upper) bounds for the given landmark distance columns.
+        """
+        if same:
+            return 0, 0
+
+        # Plain Python is faster than NumPy on a handful of landmarks
+        lower, upper = 1, math.inf
+        for a, b in zip(from_source.tolist(), to_target.tolist()):
+            if (a < 0) != (b < 0):
+                return math.inf, math.inf
+            if a >= 0:
+                lower = max(lower, abs(a - b))
+                upper = min(upper, a + b)
+        return lower, upper
+
+    def _path(self, parent, person):
+        """
+        Build the (movie_id, person_id) path leading to integer `person`.
+        """
+        path = []
+        while parent[person] is not None:
+            movie, previous = parent[person]
+            path.append((self.graph.movie_ids[movie], self.graph.person_ids[person]))
+            person = previous
+        path.reverse()
+        return path
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+import heapq
+import itertools
+import sys
+import time
+from array import array
+from collections import Counter
+from bisect import bisect_left
+
+import degrees
+
+# Number of ranked results returned by default
+LIMIT = 10
+
+# Largest number of typos tolerated by fuzzy lookups
+MAX_DISTANCE = 2
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python nameindex.py [directory]")
+    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+
+    print("Loading data...")
+    degrees.load_data(directory)
+    print("Data loaded.")
+    print("Building name index...")
+    index = NameIndex(degrees.names, degrees.people)
+    print("Index built.")
+
+    while True:
+        try:
+            query = input("Name: ")
+        except EOFError:
+            break
+        start = time.perf_counter()
+        matches = index.lookup(query)
+        elapsed = (time.perf_counter() - start) * 1000
+        for match in matches:
+            print(f"  {match['match']:>6} {match['distance']}  ID: {match['person_id']}, "
+                  f"Name: {match['name']}, Birth: {match['birth']}, Movies: {match['movies']}")
+        print(f"{len(matches)} matches in {elapsed:.2f} ms.")
+
+
+class NameIndex():
+    """
+    Non-interactive name resolution over the `names` and `people` mappings
+    filled by `load_data`.
+
+    Supports exact, prefix and typo-tolerant lookups. Results are ranked by
+    how well the name matches, then by closeness to a given birth year,
+    then by number of movies.
+    """
+    def __init__(self, names, people):
+        self.names = names
+        self.people = people
+
+        # Distinct lowercase names, sorted so a prefix is a contiguous range
+        self.keys = sorted(names)
+
+        # Movie count of every person, used to rank homonyms
+        self.movies = {}
+        for key in self.keys:
+            for person_id in names[key]:
+                self.movies[person_id] = len(people[person_id]["movies"])
+
+        # Position of every name's best-ranked person among all people, ranked
+        # by movie count then ID, and a segment tree whose node `j` holds the
+        # position in `keys` of the best-ranked name under it (-1 if none),
+        # so the best names of a prefix range are found without scanning it
+        ranking = sorted(self.movies, key=lambda person_id: (-self.movies[person_id], person_id))
+        position = {person_id: r for r, person_id in enumerate(ranking)}
+        self.leading = array("i", (min(position[p] for p in names[key]) for key in self.keys))
+        del ranking, position
+        self.size = 1
+        while self.size < len(self.keys):
+            self.size *= 2
+        self.tree = array("i", [-1]) * (2 * self.size)
+        self.tree[self.size:self.size + len(self.keys)] = array("i", range(len(self.keys)))
+        for j in range(self.size - 1, 0, -1):
+            self.tree[j] = self._better(self.tree[2 * j], self.tree[2 * j + 1])
+
+        # Trigram -> positions in `keys` of the names containing it
+        postings = {}
+        for i, key in enumerate(self.keys):
+            for trigram in set(trigrams(key)):
+                postings.setdefault(trigram, []).append(i)
+        self.trigrams = {trigram: array("i", positions) for trigram, positions in postings.items()}
+
+    def lookup(self, query, limit=LIMIT, birth=None, max_distance=MAX_DISTANCE):
+        """
+        Return up to `limit` ranked matches for `query`.
+
+        Typo-tolerant matching only runs when no name equals or starts with `query`.
+
+        Each match is a dict with keys person_id, name, birth, movies,
+        match ("exact", "prefix" or "fuzzy") and distance (the number of
+        typos between the query and the name, 0 for exact and prefix matches).
+        If `birth` is given, people born closer to that year rank first.
+        """
+        query = query.strip().lower()
+        if not query:
+            return []
+
+        # Best (kind, distance) found for every matching name
+        found = {}
+        if query in self.names:
+            found[query] = (0, 0)
+
+        # Without a birth year, the people ranked first among prefix matches
+        # are among the names whose best person ranks first; with one,
+        # any name of the range may hold the closest birth
+        for key in self.prefixed(query, limit if birth is None else None):
+            found.setdefault(key, (1, 0))
+
+        # Fall back to typo-tolerant matching, widening the tolerance
+        # one edit at a time since tighter searches are cheaper
+        for tolerance in range(1, max_distance + 1):
+            if found:
+                break
+            for key, distance in self.similar(query, tolerance):
+                if key not in found:
+                    found[key] = (2, distance)
+
+        ranked = []
+        for key, (kind, distance) in found.items():
+            for person_id in self.names[key]:
+                person = self.people[person_id]
+                rank = (kind, distance, _birth_gap(person["birth"], birth),
+                        -self.movies[person_id], person_id)
+                ranked.append((rank, {
+                    "person_id": person_id,
+                    "name": person["name"],
+                    "birth": person["birth"],
+                    "movies": self.movies[person_id],
+                    "match": ["exact", "prefix", "fuzzy"][kind],
+                    "distance": distance,
+                }))
+        return [match for _, match in heapq.nsmallest(limit, ranked, key=lambda item: item[0])]
+
+    def resolve(self, name, birth=None):
+        """
+        Return the person_id of the best exact match for `name`, or None.
+
+        Homonyms are told apart by closeness to `birth` if given,
+        then by number of movies.
+        """
+        matches = [
+            match for match in self.lookup(name, birth=birth)
+            if match["match"] == "exact"
+        ]
+        return matches[0]["person_id"] if matches else None
+
+    def prefixed(self, prefix, limit=LIMIT):
+        """
+        Return the `limit` lowercase names starting with `prefix` whose best
+        person has the most movies (ties by person ID), best first, or every
+        such name in sorted order if `limit` is None.
+
+        Each name costs a few segment tree queries, however many names
+        share the prefix.
+        """
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + chr(sys.maxunicode), lo)
+        if limit is None:
+            return self.keys[lo:hi]
+
+        # Ranges of positions, keyed by their best name, split around it once taken
+        keys = []
+        heap = [(self.leading[best], best, lo, hi)] if (best := self._best(lo, hi)) >= 0 else []
+        while heap and len(keys) < limit:
+            _, i, lo, hi = heapq.heappop(heap)
+            keys.append(self.keys[i])
+            for start, end in ((lo, i), (i + 1, hi)):
+                best = self._best(start, end)
+                if best >= 0:
+                    heapq.heappush(heap, (self.leading[best], best, start, end))
+        return keys
+
+    def _best(self, lo, hi):
+        """
+        Return the position of the best-ranked name in `keys[lo:hi]`, or -1 if empty.
+        """
+        best = -1
+        lo += self.size
+        hi += self.size
+        while lo < hi:
+            if lo & 1:
+                best = self._better(best, self.tree[lo])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                best = self._better(best, self.tree[hi])
+            lo //= 2
+            hi //= 2
+        return best
+
+    def _better(self, a, b):
+        """
+        Return whichever of positions `a` and `b` holds the better-ranked name,
+        where -1 stands for no name.
+        """
+        if a < 0:
+            return b
+        if b < 0:
+            return a
+        return a if self.leading[a] <= self.leading[b] else b
+
+    def similar(self, query, max_distance=MAX_DISTANCE):
+        """
+        Return (name, distance) pairs for the lowercase names
+        within `max_distance` edits of `query`.
+        """
+        grams = sorted(set(trigrams(query)), key=lambda trigram: len(self.trigrams.get(trigram, ())))
+
+        # Each edit breaks at most 3 trigrams, so a match must contain at least
+        # one of the 3 * max_distance + 1 rarest ones; short queries allow fewer typos
+        max_distance = min(max_distance, (len(grams) - 1) // 3)
+        if max_distance == 0:
+            return []
+
+        # Count how many of the rarest trigrams each name contains; also counting
+        # a few more trigrams, as long as they are cheap, tightens the filter
+        needed = 3 * max_distance + 1
+        budget = 2 * sum(len(self.trigrams.get(trigram, ())) for trigram in grams[:needed])
+        counted = needed
+        size = budget // 2
+        while counted < len(grams) and size + len(self.trigrams.get(grams[counted], ())) <= budget:
+            size += len(self.trigrams.get(grams[counted], ()))
+            counted += 1
+        counts = Counter(itertools.chain.from_iterable(
+            self.trigrams.get(trigram, ()) for trigram in grams[:counted]
+        ))
+        candidates = [i for i, count in counts.items() if count >= counted - needed + 1]
+        return self._verify(query, candidates, max_distance)
+
+    def _verify(self, query, positions, max_distance):
+        """
+        Return (name, distance) pairs for the names at `positions`
+        that really are within `max_distance` edits of `query`.
+        """
+        grams = set(trigrams(query))
+        shared = len(grams) - 3 * max_distance
+
+        results = []
+        for i in positions:
+            key = self.keys[i]
+
+            # Cheap filters first: length difference and trigram overlap
+            if abs(len(key) - len(query)) > max_distance:
+                continue
+            if len(grams.intersection(trigrams(key))) < shared:
+                continue
+            distance = edit_distance(query, key, max_distance)
+            if distance <= max_distance:
+                results.append((key, distance))
+        return results
+
+
+def trigrams(text):
+    """
+    Return the list of trigrams of `text`, padded so that
+    the first and last characters also start and end a trigram.
+    """
+    padded = f"  {text} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def edit_distance(a, b, limit):
+    """
+    Return the Levenshtein distance between `a` and `b`,
+    or `limit + 1` as soon as it is known to exceed `limit`.
+
+    Only the diagonal band of width `limit` is computed, since
+    any cell outside of it already costs more than `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    beyond = limit + 1
+    previous = [j if j <= limit else beyond for j in range(len(b) + 1)]
+    for i, ca in enumerate(a, 1):
+        current = [beyond] * (len(b) + 1)
+        if i <= limit:
+            current[0] = i
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != b[j - 1]),
+            )
+        if min(current) > limit:
+            return beyond
+        previous = current
+    return min(previous[-1], beyond)
+
+
+def _birth_gap(birth, year):
+    """
+    Return how far a birth year is from `year`, with unknown years last.
+    """
+    if year is None:
+        return 0
+    try:
+        return abs(int(birth) - int(year))
+    except ValueError:
+        return float("inf")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import batch
+import degrees
+
+# Graph shared by the worker processes, loaded once per process and directory
+_graph = None
+
+# Directory `_graph` was loaded from
+_graph_directory = None
+
+
+def main():
+    args = sys.argv[1:]
+    workers = os.cpu_count()
+    if "--workers" in args:
+        i = args.index("--workers")
+        try:
+            workers = int(args[i + 1])
+        except (IndexError, ValueError):
+            sys.exit("--workers expects a number")
+        del args[i:i + 2]
+    if len(args) not in [2, 3]:
+        sys.exit("Usage: python parallel.py directory pairs.csv [output.jsonl] [--workers N]")
+
+    pairs = batch.read_pairs(args[1])
+    output = open(args[2], "w", encoding="utf-8") if len(args) == 3 else sys.stdout
+    start = time.perf_counter()
+    try:
+        for line in parallel_queries(args[0], pairs, workers):
+            output.write(line + "\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    elapsed = time.perf_counter() - start
+    print(f"{len(pairs)} queries in {elapsed:.2f} s ({len(pairs) / elapsed:.0f} queries/s) "
+          f"on {workers or os.cpu_count()} workers", file=sys.stderr)
+
+
+def parallel_queries(directory, pairs, workers=None):
+    """
+    Answer every (source, target) pair on the data in `directory`,
+    spreading the per-source searches of `batch.batch_queries` across
+    `workers` processes.
+
+    The graph is loaded once in this process before the pool starts, so
+    forked workers share it copy-on-write; with a snapshot (see snapshot.py)
+    the arrays are memory-mapped and share the same pages in every process.
+    Yields one JSON line per pair, in the order of `batch.batch_queries`.
+    """
+    _use_graph(directory)
+
+    groups = list(batch.group_by_source(pairs).items())
+    workers = workers or os.cpu_count()
+
+    # A few jobs per worker keep every core busy when group sizes vary
+    chunksize = max(1, len(groups) // (workers * 4))
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_use_graph,
+                             initargs=(directory,)) as executor:
+        for lines in executor.map(_answer_group, groups, chunksize=chunksize):
+            yield from lines
+
+
+def _use_graph(directory):
+    """
+    Load the graph of `directory`, unless this process already holds it
+    (workers forked after `parallel_queries` loaded it inherit it).
+    """
+    global _graph, _graph_directory
+    directory = os.path.abspath(directory)
+    if _graph is None or _graph_directory != directory:
+        _graph = batch.load_graph(directory)
+        _graph_directory = directory
+
+
+def _answer_group(group):
+    """
+    Return the JSON lines answering one (source, targets) group.
+    """
+    source, targets = group
+    results = batch.query_source(_graph, source, targets, degrees.components)
+    return [json.dumps(result) for result in results]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+import os
+import sys
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+
+import numpy as np
+
+import degrees
+from graph import CSRGraph
+from util import ComponentIndex
+
+# Snapshots live in this subdirectory of the data directory
+SNAPSHOT = "snapshot"
+
+# Written last, so its modification time tells when the snapshot was completed
+MANIFEST = "MANIFEST"
+
+# Bumped whenever the on-disk layout changes
+VERSION = "2"
+
+# CSV files a snapshot is built from
+SOURCES = ["people.csv", "movies.csv", "stars.csv"]
+
+# Integer arrays of the CSR graph
+ARRAYS = ["person_indptr", "person_movies", "movie_indptr", "movie_stars",
+          "name_people", "person_components"]
+
+# String columns, stored as one UTF-8 blob plus offsets each
+STRINGS = ["person_ids", "person_names", "person_births",
+           "movie_ids", "movie_titles", "movie_years", "name_keys"]
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python snapshot.py directory")
+    directory = sys.argv[1]
+
+    print("Loading data...")
+    degrees.load_data(directory, use_snapshot=False)
+    print("Writing snapshot...")
+    write_snapshot(directory, degrees.people, degrees.movies)
+    print(f"Snapshot written to {os.path.join(directory, SNAPSHOT)}.")
+
+
+def snapshot_is_fresh(directory):
+    """
+    Return True if `directory` holds a complete snapshot
+    that is newer than every CSV file it was built from.
+    """
+    manifest = os.path.join(directory, SNAPSHOT, MANIFEST)
+    try:
+        with open(manifest) as f:
+            if f.read().strip() != VERSION:
+                return False
+        built = os.path.getmtime(manifest)
+    except OSError:
+        return False
+    return all(
+        os.path.getmtime(os.path.join(directory, source)) <= built
+        for source in SOURCES
+        if os.path.exists(os.path.join(directory, source))
+    )
+
+
+def write_snapshot(directory, people, movies):
+    """
+    Write the `people` and `movies` dicts filled by `load_data`
+    as a snapshot inside `directory`.
+    """
+    path = os.path.join(directory, SNAPSHOT)
+    os.makedirs(path, exist_ok=True)
+
+    # Invalidate any previous snapshot before overwriting its files
+    if os.path.exists(os.path.join(path, MANIFEST)):
+        os.remove(os.path.join(path, MANIFEST))
+
+    graph = CSRGraph.from_data(people, movies)
+    person_ids = graph.person_ids
+    movie_ids = graph.movie_ids
+
+    # People sorted by lowercase name, so a name resolves to a contiguous range
+    lowered = [people[person_id]["name"].lower() for person_id in person_ids]
+    name_people = sorted(range(len(person_ids)), key=lambda i: lowered[i])
+
+    # Root of the component of every person
+    components = ComponentIndex.from_data(people, movies)
+    roots = [graph.person_index[components.find(person_id)] for person_id in person_ids]
+
+    columns = {
+        "person_indptr": graph.person_indptr,
+        "person_movies": graph.person_movies,
+        "movie_indptr": graph.movie_indptr,
+        "movie_stars": graph.movie_stars,
+        "name_people": np.array(name_people, dtype=np.int32),
+        "person_components": np.array(roots, dtype=np.int32),
+    }
+    for name, array in columns.items():
+        np.save(os.path.join(path, f"{name}.npy"), array)
+
+    strings = {
+        "person_ids": person_ids,
+        "person_names": [people[person_id]["name"] for person_id in person_ids],
+        "person_births": [people[person_id]["birth"] for person_id in person_ids],
+        "movie_ids": movie_ids,
+        "movie_titles": [movies[movie_id]["title"] for movie_id in movie_ids],
+        "movie_years": [movies[movie_id]["year"] for movie_id in movie_ids],
+        "name_keys": [lowered[i] for i in name_people],
+    }
+    for name, values in strings.items():
+        encoded = [value.encode("utf-8") for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        np.save(os.path.join(path, f"{name}.npy"), np.frombuffer(b"".join(encoded), dtype=np.uint8))
+        np.save(os.path.join(path, f"{name}.offsets.npy"), offsets)
+
+    with open(os.path.join(path, MANIFEST), "w") as f:
+        f.write(VERSION + "\n")
+
+
+def load_snapshot(directory):
+    """
+    Memory-map the snapshot inside `directory`.
+
+    Return (names, people, movies, graph, components), where the first three
+    are mappings shaped like the dicts filled by `load_data`, `graph` is the
+    `CSRGraph` they are backed by, and `components` is their ComponentIndex.
+    """
+    path = os.path.join(directory, SNAPSHOT)
+    arrays = {
+        name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+        for name in ARRAYS
+    }
+    strings = {
+        name: StringTable(
+            np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r"),
+            np.load(os.path.join(path, f"{name}.offsets.npy"), mmap_mode="r"),
+        )
+        for name in STRINGS
+    }
+
+    graph = CSRGraph(
+        strings["person_ids"], strings["movie_ids"],
+        arrays["person_indptr"], arrays["person_movies"],
+        arrays["movie_indptr"], arrays["movie_stars"],
+        person_index=SortedIndex(strings["person_ids"]),
+        movie_index=SortedIndex(strings["movie_ids"]),
+    )
+    names = NamesView(graph, strings["name_keys"], arrays["name_people"])
+    people = PeopleView(graph, strings["person_names"], strings["person_births"])
+    movies = MoviesView(graph, strings["movie_titles"], strings["movie_years"])
+    components = ComponentIndex(RootsView(graph, arrays["person_components"]))
+    return names, people, movies, graph, components
+
+
+class StringTable():
+    """
+    Read-only sequence of strings stored as one UTF-8 byte array
+    and the offsets where each string starts.
+    """
+    def __init__(self, data, offsets):
+        # Memoryviews index and slice much faster than NumPy arrays one item at a time
+        self.data = memoryview(data)
+        self.offsets = memoryview(offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class SortedIndex(Mapping):
+    """
+    Maps each string of a sorted `StringTable` to its position, by binary search.
+    """
+    def __init__(self, table):
+        self.table = table
+
+    def __getitem__(self, key):
+        i = bisect_left(self.table, key)
+        if i == len(self.table) or self.table[i] != key:
+            raise KeyError(key)
+        return i
+
+    def __iter__(self):
+        return iter(self.table)
+
+    def __len__(self):
+        return len(self.table)
+
+
+class RootsView(Mapping):
+    """
+    Maps person_ids to the root person_id of their component.
+    """
+    def __init__(self, graph, roots):
+        self.graph = graph
+        self.roots = roots
+
+    def __getitem__(self, person_id):
+        return self.graph.person_ids[int(self.roots[self.graph.person_index[person_id]])]
+
+    def __iter__(self):
+        return iter(self.graph.person_ids)
+
+    def __len__(self):
+        return len(self.graph.person_ids)
+
+
+class OverlayView(Mapping):
+    """
+    Mapping over read-only snapshot data, with an in-memory overlay
+    so `degrees.ingest` can add, replace and delete entries.
+
+    Subclasses implement `lookup(key)` and `snapshot_keys()`.
+    """
+    def __init__(self):
+        self.overlay = {}
+        self.deleted = set()
+
+    def __getitem__(self, key):
+        if key in self.overlay:
+            return self.overlay[key]
+        if key in self.deleted:
+            raise KeyError(key)
+        return self.lookup(key)
+
+    def __setitem__(self, key, value):
+        self.overlay[key] = value
+        self.deleted.discard(key)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self.overlay.pop(key, None)
+        self.deleted.add(key)
+
+    def __iter__(self):
+        for key in self.snapshot_keys():
+            if key not in self.overlay and key not in self.deleted:
+                yield key
+        yield from self.overlay
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class NamesView(OverlayView):
+    """
+    Maps lowercase names to a set of corresponding person_ids.
+    """
+    def __init__(self, graph, sorted_names, sorted_people):
+        super().__init__()
+        self.graph = graph
+        self.sorted_names = sorted_names
+        self.sorted_people = sorted_people
+
+    def lookup(self, name):
+        start = bisect_left(self.sorted_names, name)
+        end = bisect_right(self.sorted_names, name, lo=start)
+        if start == end:
+            raise KeyError(name)
+        return {self.graph.person_ids[int(i)] for i in self.sorted_people[start:end]}
+
+    def snapshot_keys(self):
+        previous = None
+        for key in self.sorted_names:
+            if key != previous:
+                yield key
+            previous = key
+
+
+class PeopleView(OverlayView):
+    """
+    Maps person_ids to a dictionary of: name, birth, movies (a set of movie_ids).
+    """
+    def __init__(self, graph, names, births):
+        super().__init__()
+        self.graph = graph
+        self.names = names
+        self.births = births
+
+    def lookup(self, person_id):
+        person = self.graph.person_index[person_id]
+        return {
+            "name": self.names[person],
+            "birth": self.births[person],
+            "movies": {self.graph.movie_ids[int(movie)] for movie in self.graph.movies_for(person)},
+        }
+
+    def snapshot_keys(self):
+        return iter(self.graph.person_ids)
+
+    def __len__(self):
+        if not self.overlay and not self.deleted:
+            return len(self.graph.person_ids)
+        return super().__len__()
+
+
+class MoviesView(OverlayView):
+    """
+    Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids).
+    """
+    def __init__(self, graph, titles, years):
+        super().__init__()
+        self.graph = graph
+        self.titles = titles
+        self.years = years
+
+    def lookup(self, movie_id):
+        movie = self.graph.movie_index[movie_id]
+        return {
+            "title": self.titles[movie],
+            "year": self.years[movie],
+            "stars": {self.graph.person_ids[int(person)] for person in self.graph.stars_for(movie)},
+        }
+
+    def snapshot_keys(self):
+        return iter(self.graph.movie_ids)
+
+    def __len__(self):
+        if not self.overlay and not self.deleted:
+            return len(self.graph.movie_ids)
+        return super().__len__()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,8 @@
+import heapq
+import itertools
+from collections import deque
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
@@ -36,3 +41,135 @@ class QueueFrontier(StackFrontier):
             node = self.frontier[0]
             self.frontier = self.frontier[1:]
             return node
+
+
+class DequeStackFrontier():
+    """
+    Stack frontier backed by a deque, with a companion count of the
+    states it holds so `contains_state` is a hash lookup.
+    """
+    def __init__(self):
+        self.frontier = deque()
+        self.states = {}
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def _forget(self, node):
+        count = self.states[node.state] - 1
+        if count:
+            self.states[node.state] = count
+        else:
+            del self.states[node.state]
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.pop()
+            self._forget(node)
+            return node
+
+
+class DequeQueueFrontier(DequeStackFrontier):
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.popleft()
+            self._forget(node)
+            return node
+
+
+class PriorityFrontier(DequeStackFrontier):
+    """
+    Heap frontier that removes the node with the lowest priority first.
+    Nodes with equal priority come out in insertion order.
+    """
+    def __init__(self):
+        self.frontier = []
+        self.states = {}
+        self.counter = itertools.count()
+
+    def add(self, node, priority=0):
+        heapq.heappush(self.frontier, (priority, next(self.counter), node))
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = heapq.heappop(self.frontier)[2]
+            self._forget(node)
+            return node
+
+
+class ComponentIndex():
+    """
+    Union-find over person_ids: two people are in the same component
+    exactly when a chain of shared movies connects them.
+
+    Optionally starts from `base`, a mapping of person_id to the root
+    person_id of its component (as stored in a snapshot); unions made
+    afterwards are kept in memory on top of it.
+    """
+    def __init__(self, base=None):
+        self.base = base
+        self.parent = {}
+
+    @classmethod
+    def from_data(cls, people, movies):
+        """
+        Build the components of the `people` and `movies` filled by `load_data`.
+        """
+        index = cls()
+        for movie in movies.values():
+            stars = iter(movie["stars"])
+            first = next(stars, None)
+            for person_id in stars:
+                index.union(first, person_id)
+        return index
+
+    def find(self, person_id):
+        """
+        Return the root person_id of the component of `person_id`.
+        """
+        while True:
+            parent = self._parent(person_id)
+            if parent == person_id:
+                return person_id
+
+            # Path halving: point to the grandparent while walking up
+            grandparent = self._parent(parent)
+            self.parent[person_id] = grandparent
+            person_id = grandparent
+
+    def union(self, a, b):
+        """
+        Merge the components of person_ids `a` and `b`.
+        """
+        root_a = self.find(a)
+        root_b = self.find(b)
+        if root_a != root_b:
+            self.parent[root_a] = root_b
+
+    def connected(self, a, b):
+        """
+        Return True if person_ids `a` and `b` are in the same component.
+        """
+        return self.find(a) == self.find(b)
+
+    def _parent(self, person_id):
+        if person_id in self.parent:
+            return self.parent[person_id]
+        if self.base is not None:
+            return self.base.get(person_id, person_id)
+        return person_id
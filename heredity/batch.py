@@ -0,0 +1,236 @@
+import csv
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from heredity import ENGINES, PROBS, infer, parse_data
+
+# Cached results live in this directory, one JSON file per content hash
+CACHE = ".heredity-cache"
+
+# Bumped whenever the cached results change meaning
+VERSION = "1"
+
+# Default inference engine: exact, and much faster than plain enumeration
+ENGINE = "pruned"
+
+# Families handed to a worker at a time, per worker, so small families
+# are not dominated by the cost of sending them between processes
+CHUNKS_PER_WORKER = 4
+
+# Columns of the output, one row per person of every family
+COLUMNS = ["family", "person", "gene_0", "gene_1", "gene_2", "trait_true", "trait_false"]
+
+
+def main():
+    args = sys.argv[1:]
+    options = {"--engine": ENGINE, "--workers": os.cpu_count() or 1, "--cache": CACHE}
+    for option in list(options):
+        if option in args:
+            i = args.index(option)
+            try:
+                value = args[i + 1]
+                options[option] = int(value) if option == "--workers" else value
+            except (IndexError, ValueError):
+                sys.exit(f"{option} expects a {'number' if option == '--workers' else 'value'}")
+            del args[i:i + 2]
+    if len(args) != 2:
+        sys.exit("Usage: python batch.py (directory | manifest) output.csv|output.parquet "
+                 "[--engine NAME] [--workers N] [--cache DIRECTORY]")
+    engine = options["--engine"]
+    if engine != "enumeration" and engine not in ENGINES:
+        sys.exit(f"Unknown engine: {engine}")
+    source, output = args
+    if output.endswith(".parquet") and importlib.util.find_spec("pyarrow") is None:
+        sys.exit("Writing Parquet needs pyarrow: pip install pyarrow")
+
+    families = family_files(source)
+    results, stats = run_batch(families, engine, options["--workers"], options["--cache"])
+    write_results(output, results)
+
+    print(f"{len(families)} families: {stats['cached']} cached, "
+          f"{stats['computed']} computed, {len(stats['failed'])} failed", file=sys.stderr)
+    for filename, error in stats["failed"]:
+        print(f"  {filename}: {error}", file=sys.stderr)
+    if stats["failed"]:
+        sys.exit(1)
+
+
+def family_files(source):
+    """
+    Return the family CSV files of `source`: every .csv file in it, sorted,
+    if it is a directory, or else the files it lists, one per line, relative
+    to its own directory (blank lines and lines starting with # are skipped).
+    """
+    if os.path.isdir(source):
+        return [
+            os.path.join(source, filename)
+            for filename in sorted(os.listdir(source))
+            if filename.endswith(".csv")
+        ]
+    base = os.path.dirname(source)
+    with open(source) as f:
+        lines = [line.strip() for line in f]
+    return [os.path.join(base, line) for line in lines if line and not line.startswith("#")]
+
+
+def content_key(content, engine):
+    """
+    Return the cache key of a family file's `content` (bytes) inferred by
+    `engine`: it changes with the file, the engine and the model.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{VERSION}\0{engine}\0{PROBS!r}\0".encode("utf-8"))
+    digest.update(content)
+    return digest.hexdigest()
+
+
+def run_batch(families, engine=ENGINE, workers=1, cache=CACHE):
+    """
+    Infer the probability distributions of every family file in `families`.
+
+    Every file is read once and hashed. Files whose content was inferred
+    by the same engine before are answered from `cache` (no caching if it
+    is None), and identical files are only inferred once; the others are
+    inferred on `workers` processes (in this process if `workers` is 1)
+    and added to the cache.
+
+    Return, per family in order, its filename and its rows (person and
+    probabilities, as in `COLUMNS`) or None if it failed, and a dict of
+    counts of cached and computed families and the (filename, error)
+    pairs of failed ones.
+    """
+    keys = []
+    contents = {}
+    rows = {}
+    failed = []
+    for filename in families:
+        try:
+            with open(filename, "rb") as f:
+                content = f.read()
+        except OSError as e:
+            keys.append(None)
+            failed.append((filename, e.strerror))
+            continue
+        key = content_key(content, engine)
+        keys.append(key)
+        if key not in rows and key not in contents:
+            cached = read_cache(cache, key)
+            if cached is not None:
+                rows[key] = cached
+            else:
+                contents[key] = content
+    cached = sum(1 for key in keys if key in rows)
+
+    tasks = [(key, content, engine) for key, content in contents.items()]
+    if workers == 1 or len(tasks) <= 1:
+        outcomes = [_infer_family(task) for task in tasks]
+    else:
+        chunksize = max(1, len(tasks) // (workers * CHUNKS_PER_WORKER))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            outcomes = list(executor.map(_infer_family, tasks, chunksize=chunksize))
+
+    errors = {}
+    for key, result, error in outcomes:
+        if error is None:
+            rows[key] = result
+            write_cache(cache, key, result)
+        else:
+            errors[key] = error
+
+    results = []
+    for filename, key in zip(families, keys):
+        if key in errors:
+            failed.append((filename, errors[key]))
+        results.append((filename, rows.get(key)))
+    stats = {
+        "cached": cached,
+        "computed": sum(1 for key in keys if key in contents and key in rows),
+        "failed": failed,
+    }
+    return results, stats
+
+
+def read_cache(cache, key):
+    """
+    Return the rows cached under `key`, or None if there are none.
+    """
+    if cache is None:
+        return None
+    try:
+        with open(os.path.join(cache, f"{key}.json")) as f:
+            return [tuple(row) for row in json.load(f)]
+    except (OSError, ValueError):
+        return None
+
+
+def write_cache(cache, key, rows):
+    """
+    Cache `rows` under `key`, replacing the file whole so that concurrent
+    batches never read a partial entry.
+    """
+    if cache is None:
+        return
+    os.makedirs(cache, exist_ok=True)
+    path = os.path.join(cache, f"{key}.json")
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(rows, f)
+    os.replace(temporary, path)
+
+
+def write_results(output, results):
+    """
+    Write the rows of every family that did not fail to `output`, as Parquet
+    if its name ends with .parquet (which needs pyarrow) and as CSV otherwise.
+    """
+    columns = {column: [] for column in COLUMNS}
+    for filename, rows in results:
+        for row in rows or []:
+            columns["family"].append(filename)
+            for column, value in zip(COLUMNS[1:], row):
+                columns[column].append(value)
+
+    if output.endswith(".parquet"):
+        import pyarrow
+        import pyarrow.parquet
+        pyarrow.parquet.write_table(pyarrow.table(columns), output)
+        return
+
+    with open(output, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows(zip(*columns.values()))
+
+
+def _infer_family(task):
+    """
+    Infer the distributions of one family file's content, returning its key,
+    its rows (or None) and an error message (or None).
+    """
+    key, content, engine = task
+    try:
+        people = parse_data(content.decode("utf-8").splitlines())
+        probabilities = infer(people, engine)
+    except Exception as e:
+        # One bad family must not stop the batch or lose the others' results
+        return key, None, f"{type(e).__name__}: {e}"
+    rows = [
+        (
+            person,
+            probabilities[person]["gene"][0],
+            probabilities[person]["gene"][1],
+            probabilities[person]["gene"][2],
+            probabilities[person]["trait"][True],
+            probabilities[person]["trait"][False],
+        )
+        for person in people
+    ]
+    return key, rows, None
+
+
+if __name__ == "__main__":
+    main()
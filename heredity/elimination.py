@@ -0,0 +1,157 @@
+import itertools
+
+from heredity import PROBS, empty_probabilities, gene_given_parents, infer_traits
+
+# Possible numbers of copies of the gene
+GENES = (0, 1, 2)
+
+
+class Factor():
+    """
+    Non-negative function of the gene counts of some people, stored as a
+    dict mapping every assignment of `variables`, a tuple of names, to a value.
+    """
+    def __init__(self, variables, values):
+        self.variables = variables
+        self.values = values
+
+
+def infer(people):
+    """
+    Compute the gene and trait probability distributions of every person
+    by variable elimination on the Bayesian network of the pedigree.
+
+    Each person's gene count depends on their parents' gene counts, and
+    their trait on their own gene count. Known traits become evidence
+    factors on gene counts; unknown traits are summed out for free, since
+    nothing depends on them. The gene marginal of each person is then
+    found by summing out every other gene count, in an order that keeps
+    intermediate factors small, so the cost grows exponentially with the
+    tree-width of the pedigree rather than with the number of people.
+    """
+    factors = network_factors(people)
+    order = elimination_order(factors)
+
+    probabilities = empty_probabilities(people)
+
+    # Queries share the eliminations of the people before them in the order
+    prefix = factors
+    for k, person in enumerate(order):
+        remaining = prefix
+        for other in order[k + 1:]:
+            remaining = eliminate_from(remaining, other)
+        prefix = eliminate_from(prefix, person)
+        marginal = {genes: product(remaining, genes) for genes in GENES}
+        total = sum(marginal.values())
+        for genes in GENES:
+            probabilities[person]["gene"][genes] = marginal[genes] / total
+
+    infer_traits(people, probabilities)
+    return probabilities
+
+
+def network_factors(people):
+    """
+    Return the factors of the pedigree network with traits summed out or fixed:
+    one inheritance factor per person, and one evidence factor per known trait.
+    """
+    factors = []
+    for person, info in people.items():
+        if info["mother"] is None or info["father"] is None:
+            factors.append(Factor((person,), {
+                (genes,): gene_given_parents(genes) for genes in GENES
+            }))
+        else:
+            variables = (person, info["mother"], info["father"])
+            factors.append(Factor(variables, {
+                (genes, mother, father): gene_given_parents(genes, mother, father)
+                for genes, mother, father in itertools.product(GENES, repeat=3)
+            }))
+        if info["trait"] is not None:
+            factors.append(Factor((person,), {
+                (genes,): PROBS["trait"][genes][info["trait"]] for genes in GENES
+            }))
+    return factors
+
+
+def elimination_order(factors):
+    """
+    Return an order to eliminate every variable of `factors`, greedily
+    picking the variable whose elimination adds the fewest new edges
+    between its neighbours (min-fill), ties broken by fewest neighbours.
+    """
+    neighbours = {}
+    for factor in factors:
+        for variable in factor.variables:
+            neighbours.setdefault(variable, set()).update(factor.variables)
+    for variable in neighbours:
+        neighbours[variable].discard(variable)
+
+    def fill(variable):
+        linked = list(neighbours[variable])
+        missing = sum(
+            1 for a, b in itertools.combinations(linked, 2)
+            if b not in neighbours[a]
+        )
+        return missing, len(linked), variable
+
+    order = []
+    while neighbours:
+        variable = min(neighbours, key=fill)
+        linked = neighbours.pop(variable)
+        for other in linked:
+            neighbours[other].discard(variable)
+            neighbours[other].update(linked - {other})
+        order.append(variable)
+    return order
+
+
+def eliminate_from(factors, variable):
+    """
+    Return `factors` with those mentioning `variable` replaced by
+    their product with `variable` summed out.
+    """
+    involved = [factor for factor in factors if variable in factor.variables]
+    if not involved:
+        return factors
+    rest = [factor for factor in factors if variable not in factor.variables]
+    rest.append(eliminate(involved, variable))
+    return rest
+
+
+def eliminate(factors, variable):
+    """
+    Return the product of `factors` with `variable` summed out,
+    without building the full product first.
+    """
+    variables = tuple(sorted(
+        {name for factor in factors for name in factor.variables} - {variable}
+    ))
+    positions = {name: i for i, name in enumerate(variables)}
+    lookups = [
+        (factor.values, [positions.get(name) for name in factor.variables])
+        for factor in factors
+    ]
+
+    values = {}
+    for assignment in itertools.product(GENES, repeat=len(variables)):
+        total = 0.0
+        for genes in GENES:
+            p = 1.0
+            for table, indices in lookups:
+                p *= table[tuple(genes if i is None else assignment[i] for i in indices)]
+            total += p
+        values[assignment] = total
+    return Factor(variables, values)
+
+
+def product(factors, genes):
+    """
+    Return the product of factors over at most one variable,
+    with that variable set to `genes`.
+    """
+    p = 1.0
+    for factor in factors:
+        p *= factor.values[(genes,) if factor.variables else ()]
+    return p
+
@@ -1,7 +1,8 @@
 import csv
+import importlib
 import itertools
 import sys
-from functools import reduce
+from functools import lru_cache, reduce
 
 PROBS = {
 
@@ -37,16 +38,65 @@ PROBS = {
     "mutation": 0.01
 }
 
+# Inference engines other than enumeration: name -> module defining `infer(people)`
+ENGINES = {
+    "elimination": "elimination",
+    "pruned": "enumeration",
+    "sampling": "sampling",
+    "tensor": "tensor",
+}
+
 
 def main():
 
     # Check for proper usage
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python heredity.py data.csv")
-    people = load_data(sys.argv[1])
+    args = sys.argv[1:]
+    engine = "enumeration"
+    if "--engine" in args:
+        i = args.index("--engine")
+        if i + 1 == len(args):
+            sys.exit("--engine expects a name")
+        engine = args[i + 1]
+        del args[i:i + 2]
+    if len(args) != 1:
+        sys.exit("Usage: python heredity.py data.csv [--engine NAME]")
+    if engine != "enumeration" and engine not in ENGINES:
+        sys.exit(f"Unknown engine: {engine}")
+    people = load_data(args[0])
+
+    probabilities = infer(people, engine)
+    print_probabilities(probabilities)
+
+
+def print_probabilities(probabilities):
+    """
+    Print the gene and trait probability distributions of every person.
+    """
+    for person in probabilities:
+        print(f"{person}:")
+        for field in probabilities[person]:
+            print(f"  {field.capitalize()}:")
+            for value in probabilities[person][field]:
+                p = probabilities[person][field][value]
+                print(f"    {value}: {p:.4f}")
 
-    # Keep track of gene and trait probabilities for each person
-    probabilities = {
+
+def infer(people, engine="enumeration"):
+    """
+    Return the gene and trait probability distributions of every person
+    in `people`, computed by the named inference `engine`.
+    """
+    if engine == "enumeration":
+        return enumerate_probabilities(people)
+    return importlib.import_module(ENGINES[engine]).infer(people)
+
+
+def empty_probabilities(people):
+    """
+    Return a dictionary holding a zero gene and trait
+    probability distribution for every person in `people`.
+    """
+    return {
         person: {
             "gene": {
                 2: 0,
@@ -61,6 +111,35 @@ def main():
         for person in people
     }
 
+
+def infer_traits(people, probabilities):
+    """
+    Set the trait distribution of every person in `probabilities` from their
+    gene distribution: known traits are certain, and nothing depends on an
+    unknown trait, so it follows from the person's gene count alone.
+    """
+    for person in people:
+        known = people[person]["trait"]
+        for value in (True, False):
+            if known is not None:
+                p = float(value == known)
+            else:
+                p = sum(
+                    probabilities[person]["gene"][genes] * PROBS["trait"][genes][value]
+                    for genes in probabilities[person]["gene"]
+                )
+            probabilities[person]["trait"][value] = p
+
+
+def enumerate_probabilities(people):
+    """
+    Compute the gene and trait probability distributions of every person
+    by enumerating every assignment of genes and traits that agrees with
+    the known traits, and summing their joint probabilities.
+    """
+    # Keep track of gene and trait probabilities for each person
+    probabilities = empty_probabilities(people)
+
     # Loop over all sets of people who might have the trait
     names = set(people)
     for have_trait in powerset(names):
@@ -84,15 +163,7 @@ def main():
 
     # Ensure probabilities sum to 1
     normalize(probabilities)
-
-    # Print results
-    for person in people:
-        print(f"{person}:")
-        for field in probabilities[person]:
-            print(f"  {field.capitalize()}:")
-            for value in probabilities[person][field]:
-                p = probabilities[person][field][value]
-                print(f"    {value}: {p:.4f}")
+    return probabilities
 
 
 def load_data(filename):
@@ -102,18 +173,26 @@ def load_data(filename):
     mother, father must both be blank, or both be valid names in the CSV.
     trait should be 0 or 1 if trait is known, blank otherwise.
     """
-    data = dict()
     with open(filename) as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            name = row["name"]
-            data[name] = {
-                "name": name,
-                "mother": row["mother"] or None,
-                "father": row["father"] or None,
-                "trait": (True if row["trait"] == "1" else
-                          False if row["trait"] == "0" else None)
-            }
+        return parse_data(f)
+
+
+def parse_data(lines):
+    """
+    Parse gene and trait data, in the CSV format read by `load_data`,
+    from an iterable of lines into a dictionary.
+    """
+    data = dict()
+    reader = csv.DictReader(lines)
+    for row in reader:
+        name = row["name"]
+        data[name] = {
+            "name": name,
+            "mother": row["mother"] or None,
+            "father": row["father"] or None,
+            "trait": (True if row["trait"] == "1" else
+                      False if row["trait"] == "0" else None)
+        }
     return data
 
 
@@ -129,6 +208,58 @@ def powerset(s):
     ]
 
 
+def gene_given_parents(genes, mother_genes=None, father_genes=None):
+    """
+    Return the probability that a person has `genes` copies of the gene,
+    given how many copies their mother and father have, or the
+    unconditional probability if their parents are unknown (None).
+    """
+    if mother_genes is None or father_genes is None:
+        return PROBS["gene"][genes]
+
+    # Probability that a parent passes the gene on, mutation included
+    mutation = PROBS["mutation"]
+    passes = {0: mutation, 1: 0.5, 2: 1 - mutation}
+    mother, father = passes[mother_genes], passes[father_genes]
+    if genes == 2:
+        return mother * father
+    if genes == 1:
+        return mother * (1 - father) + (1 - mother) * father
+    return (1 - mother) * (1 - father)
+
+
+def gene_distribution():
+    """
+    Return the probability distribution of the number of genes of a person,
+    for every combination of the number of genes of their parents.
+
+    Tables are built from `gene_given_parents`, so every engine shares one
+    model, and cached for the current values of `PROBS`.
+    """
+    return _gene_distribution(tuple(sorted(PROBS["gene"].items())), PROBS["mutation"])
+
+
+@lru_cache(maxsize=16)
+def _gene_distribution(gene, mutation):
+    """
+    Build the table of `gene_distribution` for the unconditional gene
+    probabilities `gene` and the `mutation` probability, which are those
+    in `PROBS` when called.
+    """
+    # You can refer to the probability as gene_prob_distr[number of genes][parents number of genes]
+    # Ex. probability to have 1 gene if one parent have 0 gene and the other one 2 is p = gene_prob_distr["1"]["02"]
+    return {
+        str(genes): {
+            "Unknown": gene_given_parents(genes),
+            **{
+                f"{mother}{father}": gene_given_parents(genes, mother, father)
+                for mother, father in itertools.product(range(3), repeat=2)
+            },
+        }
+        for genes in range(3)
+    }
+
+
 def joint_probability(people, one_gene, two_genes, have_trait):
     """
     Compute and return a joint probability.
@@ -143,56 +274,8 @@ def joint_probability(people, one_gene, two_genes, have_trait):
     # Declare an empty list for storing the probabilities to "joint"
     probabilities = []
 
-    # Declare some constant to simplify readability of further calculations
-    # p for the gene mutating
-    mutation = PROBS["mutation"]
-    # p for the gene don't mutate
-    no_mutation = (1 - mutation)
-    # p for the current gene passing to son generation (0.5 - mutation)+(0 + mutation)
-    passed = 0.5
-
-    # Create a variable that store the probability distribution of all the combination of gene x parents genes
-    gene_prob_distr ={
-        # Probability for number of gene x combination of parents genes
-        # You can refer to the probability as gene_prob_distr[number of genes][parents number of genes]
-        # Ex. probability to have 1 gene if one parent have 0 gene and the other one 2 is p = gene_prob_distr["1"][02]
-            "0":{
-                "Unknown": PROBS["gene"][0],
-                "00": no_mutation * no_mutation,
-                "01": no_mutation * passed,
-                "10": passed * no_mutation,
-                "11": passed * passed,
-                "20": (mutation) * no_mutation, 
-                "02": no_mutation * (mutation), 
-                "21": (mutation) * passed,
-                "12": passed * (mutation),
-                "22": (mutation) * (mutation),
-            },
-            "1": {
-                "Unknown": PROBS["gene"][1],
-                "00": (no_mutation * mutation) + (mutation * no_mutation),
-                "01": (no_mutation * passed) + (mutation * passed),
-                "10": (mutation * passed) + (no_mutation * passed),
-                "11": 2 * (passed * passed),
-                "20": (no_mutation * no_mutation) + (mutation * mutation),
-                "02": (mutation * mutation) + (no_mutation * no_mutation),
-                "21": (no_mutation * passed) + (mutation * passed),
-                "12": (passed * mutation) + (passed * no_mutation),
-                "22": 2 * (mutation * no_mutation),
-            },
-            "2": {
-                "Unknown": PROBS["gene"][2],
-                "00": mutation * mutation,
-                "01": mutation * passed,
-                "10": passed * mutation,
-                "11": passed * passed,
-                "20": no_mutation * mutation,
-                "02": mutation * no_mutation,
-                "21": no_mutation * passed,
-                "12": passed * no_mutation,
-                "22": no_mutation * no_mutation,
-            },
-    }
+    # Probability distribution of all the combination of gene x parents genes, built once
+    gene_prob_distr = gene_distribution()
 
     # Loop through every person and calculate the gene probability accordingly to the set in which is contained
     for person in people:
@@ -0,0 +1,325 @@
+import math
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from enumeration import parents_first
+from heredity import (PROBS, empty_probabilities, gene_given_parents, infer_traits,
+                      load_data, print_probabilities)
+
+# Possible numbers of copies of the gene
+GENES = (0, 1, 2)
+
+# Default number of samples kept, over all chains or weighted samples
+SAMPLES = 10000
+
+# Gibbs chains per worker, advanced together as the rows of one array
+CHAINS = 32
+
+# Sweeps discarded at the start of every chain
+BURN_IN = 200
+
+# Jobs per worker for likelihood weighting
+JOBS_PER_WORKER = 4
+
+# Sampling methods, by name
+METHODS = ["gibbs", "likelihood"]
+
+
+def main():
+    args = sys.argv[1:]
+    options = {"--method": "gibbs", "--samples": SAMPLES, "--seed": None, "--workers": 1}
+    for option in list(options):
+        if option in args:
+            i = args.index(option)
+            try:
+                value = args[i + 1]
+                options[option] = value if option == "--method" else int(value)
+            except (IndexError, ValueError):
+                sys.exit(f"{option} expects a {'name' if option == '--method' else 'number'}")
+            del args[i:i + 2]
+    if len(args) != 1:
+        sys.exit("Usage: python sampling.py data.csv [--method gibbs|likelihood] "
+                 "[--samples N] [--seed N] [--workers N]")
+    if options["--method"] not in METHODS:
+        sys.exit(f"Unknown method: {options['--method']}")
+    people = load_data(args[0])
+
+    probabilities, diagnostics = sample(
+        people, options["--method"], options["--samples"],
+        options["--seed"], options["--workers"],
+    )
+    print_probabilities(probabilities)
+    for name, value in diagnostics.items():
+        print(f"{name}: {value}", file=sys.stderr)
+
+
+def infer(people):
+    """
+    Estimate the gene and trait probability distributions of every person
+    by Gibbs sampling, with the default number of samples.
+    """
+    probabilities, _ = sample(people)
+    return probabilities
+
+
+class Pedigree():
+    """
+    Bayesian network of a family as arrays, with people in parents-first order.
+    """
+    def __init__(self, people):
+        self.names = parents_first(people)
+        position = {person: i for i, person in enumerate(self.names)}
+        n = len(self.names)
+
+        # Positions of each person's parents, -1 when unknown
+        self.mother = np.full(n, -1)
+        self.father = np.full(n, -1)
+        for i, person in enumerate(self.names):
+            if people[person]["mother"] and people[person]["father"]:
+                self.mother[i] = position[people[person]["mother"]]
+                self.father[i] = position[people[person]["father"]]
+
+        # Logs of the gene distribution without parents, of the inheritance
+        # table indexed [mother, father, child], and of the known traits
+        # given each gene count (0 when the trait is unknown)
+        with np.errstate(divide="ignore"):
+            self.prior = np.log([gene_given_parents(genes) for genes in GENES])
+            self.inheritance = np.log([
+                [[gene_given_parents(genes, mother, father) for genes in GENES] for father in GENES]
+                for mother in GENES
+            ])
+            self.evidence = np.zeros((n, 3))
+            for i, person in enumerate(self.names):
+                trait = people[person]["trait"]
+                if trait is not None:
+                    self.evidence[i] = np.log([PROBS["trait"][genes][trait] for genes in GENES])
+
+        # Children of each person, as (child, other parent, whether this person is the mother)
+        self.children = [[] for _ in range(n)]
+        for i in range(n):
+            if self.mother[i] >= 0:
+                self.children[self.mother[i]].append((i, self.father[i], True))
+                self.children[self.father[i]].append((i, self.mother[i], False))
+
+    def __len__(self):
+        return len(self.names)
+
+    def gene_logs(self, i, genes):
+        """
+        Return the log probability of each gene count of person `i`
+        given their parents' counts in `genes`, one row per sample.
+        """
+        if self.mother[i] < 0:
+            return np.broadcast_to(self.prior, (len(genes), 3))
+        return self.inheritance[genes[:, self.mother[i]], genes[:, self.father[i]]]
+
+
+def sample(people, method="gibbs", samples=SAMPLES, seed=None, workers=1):
+    """
+    Estimate the gene and trait probability distributions of every person
+    by sampling, split into jobs with independent random streams and run
+    on `workers` processes (in this process if `workers` is 1).
+
+    Return the probabilities and a dict of convergence diagnostics:
+    the effective sample size for likelihood weighting, and for Gibbs
+    sampling also the largest R-hat over everyone's gene count.
+    """
+    if method not in METHODS:
+        raise ValueError(f"unknown method: {method}")
+    pedigree = Pedigree(people)
+    if method == "likelihood":
+        jobs = max(1, workers * JOBS_PER_WORKER)
+        tasks = [("likelihood", pedigree, math.ceil(samples / jobs))] * jobs
+    else:
+        # Chains cost little more than one chain, so every worker runs
+        # `CHAINS` of them and the kept sweeps are split between workers
+        draws = math.ceil(samples / (CHAINS * workers))
+        tasks = [("gibbs", pedigree, (CHAINS, draws))] * workers
+    seeds = np.random.SeedSequence(seed).spawn(len(tasks))
+    tasks = [task + (seed,) for task, seed in zip(tasks, seeds)]
+
+    if workers == 1:
+        results = [_job(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_job, tasks))
+
+    if method == "likelihood":
+        genes, diagnostics = _combine_weighted(results)
+    else:
+        genes, diagnostics = _combine_chains(results)
+
+    probabilities = empty_probabilities(people)
+    for i, person in enumerate(pedigree.names):
+        for count in GENES:
+            probabilities[person]["gene"][count] = float(genes[i, count])
+    infer_traits(people, probabilities)
+    return probabilities, diagnostics
+
+
+def likelihood_weighting(pedigree, samples, rng):
+    """
+    Draw `samples` gene assignments from the gene model alone, parents first,
+    each weighted by the likelihood of the known traits.
+
+    Return the log of the largest weight, the weights of every gene count
+    of every person relative to it, and the sums of the relative weights
+    and of their squares.
+    """
+    n = len(pedigree)
+    genes = np.zeros((samples, n), dtype=np.int8)
+    logs = np.zeros(samples)
+    for i in range(n):
+        genes[:, i] = _draw(pedigree.gene_logs(i, genes), rng)
+        logs += pedigree.evidence[i, genes[:, i]]
+
+    scale = logs.max()
+    weights = np.exp(logs - scale)
+    totals = np.zeros((n, 3))
+    for count in GENES:
+        totals[:, count] = weights @ (genes == count)
+    return scale, totals, weights.sum(), (weights ** 2).sum()
+
+
+def gibbs(pedigree, chains, draws, rng):
+    """
+    Run `chains` Gibbs chains for `BURN_IN` + `draws` sweeps, each sweep
+    resampling everyone's gene count, parents first, from its distribution
+    given everyone else's. Chains start from assignments drawn from the
+    gene model, and are advanced together as the rows of one array.
+
+    Return the sum over kept sweeps and chains of each person's conditional
+    gene distribution (whose average is a lower-variance estimate than
+    counting draws), and the kept draws, indexed [chain, sweep, person].
+    """
+    n = len(pedigree)
+    genes = np.zeros((chains, n), dtype=np.int8)
+    for i in range(n):
+        genes[:, i] = _draw(pedigree.gene_logs(i, genes), rng)
+
+    totals = np.zeros((n, 3))
+    kept = np.zeros((chains, draws, n), dtype=np.int8)
+    for sweep in range(BURN_IN + draws):
+        for i in range(n):
+            logs = pedigree.gene_logs(i, genes) + pedigree.evidence[i]
+            for child, other, mother in pedigree.children[i]:
+                if mother:
+                    logs = logs + pedigree.inheritance[:, genes[:, other], genes[:, child]].T
+                else:
+                    logs = logs + pedigree.inheritance[genes[:, other], :, genes[:, child]]
+            p = np.exp(logs - logs.max(axis=1, keepdims=True))
+            p /= p.sum(axis=1, keepdims=True)
+            genes[:, i] = _draw_from(p, rng)
+            if sweep >= BURN_IN:
+                totals[i] += p.sum(axis=0)
+        if sweep >= BURN_IN:
+            kept[:, sweep - BURN_IN] = genes
+    return totals, kept
+
+
+def r_hat(draws):
+    """
+    Return the potential scale reduction factor (Gelman and Rubin) of every
+    column of `draws`, indexed [chain, draw, column]; values near 1 mean
+    the chains agree. Columns that never change get 1.
+    """
+    chains, n, _ = draws.shape
+    within = draws.var(axis=1, ddof=1).mean(axis=0)
+    between = n * draws.mean(axis=1).var(axis=0, ddof=1) if chains > 1 else 0
+    pooled = (n - 1) / n * within + between / n
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(within > 0, np.sqrt(pooled / within), 1.0)
+
+
+def effective_sample_size(draws):
+    """
+    Return the effective sample size of every column of `draws`, indexed
+    [chain, draw, column], from the autocorrelations of all chains,
+    summed until the first negative pair (Geyer's initial positive sequence).
+    Columns that never change get the total number of draws.
+    """
+    chains, n, _ = draws.shape
+    centered = draws - draws.mean(axis=1, keepdims=True)
+    size = 1 << (2 * n - 1).bit_length()
+    spectrum = np.fft.rfft(centered, size, axis=1)
+    autocovariance = np.fft.irfft(spectrum * np.conj(spectrum), size, axis=1)[:, :n] / n
+
+    within = draws.var(axis=1, ddof=1).mean(axis=0)
+    between = n * draws.mean(axis=1).var(axis=0, ddof=1) if chains > 1 else 0
+    pooled = (n - 1) / n * within + between / n
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rho = 1 - (within - autocovariance.mean(axis=0)) / pooled
+        rho[0] = 1
+        pairs = rho[:n - n % 2:2] + rho[1::2]
+        positive = np.cumprod(pairs > 0, axis=0).astype(bool)
+        tau = -1 + 2 * np.where(positive, pairs, 0).sum(axis=0)
+
+        # Anticorrelated chains can beat independent draws, up to a point
+        total = chains * n
+        tau = np.maximum(tau, 1 / math.log10(max(total, 10)))
+        return np.where(pooled > 0, total / tau, total)
+
+
+def _job(task):
+    method, pedigree, size, seed = task
+    rng = np.random.default_rng(seed)
+    if method == "likelihood":
+        return likelihood_weighting(pedigree, size, rng)
+    chains, draws = size
+    return gibbs(pedigree, chains, draws, rng)
+
+
+def _combine_weighted(results):
+    """
+    Merge the results of likelihood weighting jobs, whose weights
+    are relative to different scales.
+    """
+    scale = max(result[0] for result in results)
+    totals = sum(np.exp(s - scale) * t for s, t, _, _ in results)
+    weight = sum(np.exp(s - scale) * w for s, _, w, _ in results)
+    squares = sum(np.exp(2 * (s - scale)) * q for s, _, _, q in results)
+    genes = totals / weight
+    diagnostics = {
+        "Jobs": len(results),
+        "Effective sample size": f"{weight ** 2 / squares:.0f}",
+    }
+    return genes, diagnostics
+
+
+def _combine_chains(results):
+    """
+    Merge the results of Gibbs sampling jobs.
+    """
+    totals = sum(result[0] for result in results)
+    draws = np.concatenate([result[1] for result in results]).astype(np.float64)
+    genes = totals / totals.sum(axis=1, keepdims=True)
+    r_hats = r_hat(draws)
+    sizes = effective_sample_size(draws)
+    diagnostics = {
+        "Chains": draws.shape[0],
+        "Draws per chain": draws.shape[1],
+        "Largest R-hat": f"{r_hats.max():.3f}",
+        "Smallest effective sample size": f"{sizes.min():.0f}",
+    }
+    return genes, diagnostics
+
+
+def _draw(logs, rng):
+    """
+    Draw one gene count per row of log probabilities.
+    """
+    p = np.exp(logs - logs.max(axis=1, keepdims=True))
+    return _draw_from(p / p.sum(axis=1, keepdims=True), rng)
+
+
+def _draw_from(p, rng):
+    """
+    Draw one gene count per row of probabilities.
+    """
+    return np.minimum((rng.random((len(p), 1)) > p.cumsum(axis=1)).sum(axis=1), 2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import sys
+import tracemalloc
+
+import numpy as np
+
+from heredity import PROBS, empty_probabilities, gene_given_parents, infer_traits
+
+# Possible numbers of copies of the gene
+GENES = (0, 1, 2)
+
+# Largest joint tensor built, in bytes, before giving up
+MAX_BYTES = 2 ** 31
+
+
+def infer(people):
+    """
+    Compute the gene and trait probability distributions of every person
+    from the joint probability tensor of the pedigree, and report the
+    peak memory used on standard error.
+    """
+    probabilities, peak = infer_with_memory(people)
+    print(f"Tensor engine: peak memory {peak / 2 ** 20:.1f} MiB "
+          f"for {len(people)} people", file=sys.stderr)
+    return probabilities
+
+
+def infer_with_memory(people):
+    """
+    Return the probability distributions computed by `marginals`,
+    and the peak memory, in bytes, allocated while computing them.
+    """
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        probabilities = marginals(people)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+    return probabilities, peak
+
+
+def tensor_bytes(n):
+    """
+    Return the size in bytes of the joint tensor of `n` people.
+    """
+    return 3 ** n * np.dtype(np.float64).itemsize
+
+
+def joint_tensor(people):
+    """
+    Return the joint probability of every gene assignment that agrees
+    with the known traits, as a tensor with one axis of length 3 per
+    person (in the order of `people`) indexed by their gene count.
+
+    Each person contributes one factor: their gene distribution (given
+    their parents' gene counts, if known) times the probability of their
+    known trait. `np.einsum` multiplies all the factors into the full
+    tensor in a single pass, with no intermediate tensors.
+    """
+    if tensor_bytes(len(people)) > MAX_BYTES:
+        raise MemoryError(
+            f"joint tensor of {len(people)} people needs {tensor_bytes(len(people))} bytes; "
+            "use the elimination engine instead"
+        )
+    axis = {person: i for i, person in enumerate(people)}
+
+    operands = []
+    for person, info in people.items():
+        if info["mother"] is None or info["father"] is None:
+            factor = np.array([gene_given_parents(count) for count in GENES])
+            axes = [axis[person]]
+        else:
+            # Indexed [mother, father, person]
+            factor = np.array([
+                [[gene_given_parents(count, mother, father) for count in GENES] for father in GENES]
+                for mother in GENES
+            ])
+            axes = [axis[info["mother"]], axis[info["father"]], axis[person]]
+        if info["trait"] is not None:
+            factor = factor * np.array([PROBS["trait"][count][info["trait"]] for count in GENES])
+        operands.extend([factor, axes])
+
+    return np.einsum(*operands, list(range(len(people))))
+
+
+def marginals(people):
+    """
+    Compute the gene and trait probability distributions of every person
+    by reducing the joint tensor over everyone else's axes.
+    """
+    joint = joint_tensor(people)
+    total = joint.sum()
+
+    probabilities = empty_probabilities(people)
+    axes = set(range(joint.ndim))
+    for i, person in enumerate(people):
+        gene = joint.sum(axis=tuple(axes - {i})) / total if joint.ndim > 1 else joint / total
+        for count in GENES:
+            probabilities[person]["gene"][count] = float(gene[count])
+    infer_traits(people, probabilities)
+    return probabilities
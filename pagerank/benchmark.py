@@ -0,0 +1,150 @@
+import gc
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from crawler import crawl_graph
+from generate import power_law_graph, write_corpus
+from pagerank import DAMPING, SAMPLES, crawl, iterate_pagerank, sample_pagerank
+from power import iterate_pagerank_sparse, power_iteration
+from sampling import sample_pagerank_fast
+from solvers import METHODS, NORMS, solve
+
+# Default corpus sizes of each suite
+ENGINE_SIZES = [1000, 10000, 100000]
+SOLVER_SIZES = [1000, 10000, 100000]
+
+# Gauss-Seidel runs in pure Python, so it is skipped on larger graphs
+GAUSS_SEIDEL_LIMIT = 100000
+
+# Tolerance the solvers are compared at
+TOLERANCE = 1e-8
+
+# Samples per page drawn by the vectorized sampler
+SAMPLES_PER_PAGE = 100
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in SUITES:
+        sys.exit("Usage: python benchmark.py engines|solvers [pages ...]")
+    suite, sizes = SUITES[sys.argv[1]]
+    for n in [int(arg) for arg in sys.argv[2:]] or sizes:
+        suite(n)
+
+
+def engine_suite(n):
+    """
+    Write a generated corpus of `n` pages, then time every engine of
+    `ENGINES` that is practical at that size on it, recording its peak
+    memory and its error against an exact solve.
+
+    The dict corpus costs far more memory than the LinkGraph, so it is
+    only built when an engine needing it runs at that size.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        write_corpus(directory, n, seed=0)
+        graph = crawl_graph(directory)
+        exact = solve(graph, DAMPING, tolerance=1e-14, norm="l1", max_iterations=10000).ranks
+        needs_corpus = any(uses_corpus and n <= limit
+                           for _, limit, uses_corpus, _ in ENGINES.values())
+        corpus = graph.to_corpus() if needs_corpus else None
+
+        print(f"{n} pages, {len(graph.indices)} links")
+        print(f"  {'engine':<24} {'seconds':>8} {'peak MB':>8} {'L1 error':>9} {'max error':>9}")
+        for name, (run, limit, _, ranked) in ENGINES.items():
+            if n > limit:
+                continue
+            elapsed, peak, result = measure(run, directory, graph, corpus)
+            if ranked:
+                if isinstance(result, dict):
+                    result = np.array([result.get(page, 0.0) for page in graph.pages])
+                errors = np.abs(result - exact)
+                accuracy = f"{errors.sum():>9.1e} {errors.max():>9.1e}"
+            else:
+                accuracy = f"{'-':>9} {'-':>9}"
+            print(f"  {name:<24} {elapsed:>8.3f} {peak / 2 ** 20:>8.1f} {accuracy}")
+
+
+def measure(run, *args):
+    """
+    Return the wall time and the peak memory allocated by `run(*args)`,
+    and its result.
+
+    Tracing allocations slows Python code down, so time and memory are
+    measured on two separate runs.
+    """
+    gc.collect()
+    start = time.perf_counter()
+    run(*args)
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = run(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def solver_suite(n, tolerance=TOLERANCE):
+    """
+    Compare iterations, time and error of every solver of `solvers.METHODS`,
+    with both norms, on a generated graph of `n` pages.
+    """
+    graph = power_law_graph(n, seed=0)
+    exact = solve(graph, DAMPING, tolerance=1e-14, norm="l1", max_iterations=10000).ranks
+    print(f"{n} pages, {len(graph.indices)} links, tolerance {tolerance}")
+    print(f"  {'method':<13} {'norm':<4} {'iterations':>10} {'seconds':>8} {'L1 error':>9}")
+    for method in METHODS:
+        if method == "gauss-seidel" and n > GAUSS_SEIDEL_LIMIT:
+            continue
+        for norm in NORMS:
+            start = time.perf_counter()
+            solution = solve(graph, DAMPING, method, tolerance, norm)
+            elapsed = time.perf_counter() - start
+            error = np.abs(solution.ranks - exact).sum()
+            print(f"  {method:<13} {norm:<4} {solution.iterations:>10} "
+                  f"{elapsed:>8.3f} {error:>9.1e}")
+
+
+# Engines of the engine suite: name -> (run(directory, graph, corpus), largest
+# corpus it runs on, whether it needs the dict corpus, whether it returns ranks
+# as a {page: rank} dict or an array over `graph.pages`)
+ENGINES = {
+    "crawl": (lambda directory, graph, corpus: crawl(directory), 10 ** 6, False, False),
+    "crawl_graph": (lambda directory, graph, corpus: crawl_graph(directory), 10 ** 7, False, False),
+    "sample_pagerank": (
+        lambda directory, graph, corpus: sample_pagerank(corpus, DAMPING, SAMPLES),
+        10 ** 3, True, True,
+    ),
+    "sample_pagerank_fast": (
+        lambda directory, graph, corpus: sample_pagerank_fast(
+            corpus, DAMPING, SAMPLES_PER_PAGE * len(corpus), seed=0
+        ), 10 ** 6, True, True,
+    ),
+    "iterate_pagerank": (
+        lambda directory, graph, corpus: iterate_pagerank(corpus, DAMPING), 10 ** 3, True, True
+    ),
+    "iterate_pagerank_sparse": (
+        lambda directory, graph, corpus: iterate_pagerank_sparse(corpus, DAMPING),
+        10 ** 6, True, True,
+    ),
+    "power_iteration": (
+        lambda directory, graph, corpus: power_iteration(graph, DAMPING)[0], 10 ** 7, False, True
+    ),
+}
+
+# Benchmark suites: name -> (suite, default sizes)
+SUITES = {
+    "engines": (engine_suite, ENGINE_SIZES),
+    "solvers": (solver_suite, SOLVER_SIZES),
+}
+
+
+if __name__ == "__main__":
+    main()
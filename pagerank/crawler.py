@@ -0,0 +1,128 @@
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from linkgraph import LinkGraph
+
+# Bytes of HTML read at a time
+CHUNK_SIZE = 1 << 16
+
+# Same link pattern as `crawl`
+LINK = re.compile(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"")
+
+# Longest unfinished link tag carried over to the next chunk, in characters
+MAX_TAG = 1 << 16
+
+
+def main():
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python crawler.py corpus [workers]")
+    workers = int(sys.argv[2]) if len(sys.argv) == 3 else None
+
+    start = time.perf_counter()
+    graph = crawl_graph(sys.argv[1], workers)
+    elapsed = time.perf_counter() - start
+    print(f"Crawled {len(graph)} pages and {len(graph.indices)} links in {elapsed:.2f}s")
+
+
+def crawl_graph(directory, workers=None, processes=False, chunk_size=CHUNK_SIZE):
+    """
+    Parse a directory of HTML pages like `crawl`, but stream every file
+    in chunks on a pool of `workers` threads (or processes, since the
+    regex holds the GIL), and return the links as a LinkGraph with page
+    names interned to integers instead of a dict of string sets.
+    """
+    filenames = sorted(
+        filename for filename in os.listdir(directory)
+        if filename.endswith(".html")
+    )
+    index = {filename: i for i, filename in enumerate(filenames)}
+
+    executor_class = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    parse = partial(page_links, directory, chunk_size=chunk_size)
+    indptr = np.zeros(len(filenames) + 1, dtype=np.int64)
+    indices = []
+    with executor_class(max_workers=workers) as executor:
+        chunksize = max(1, len(filenames) // (4 * (workers or os.cpu_count())))
+        links = executor.map(parse, filenames, chunksize=chunksize) if processes \
+            else executor.map(parse, filenames)
+        for i, (filename, targets) in enumerate(zip(filenames, links)):
+            # Only include links to other pages in the corpus
+            indices.extend(sorted(
+                index[target] for target in targets
+                if target in index and target != filename
+            ))
+            indptr[i + 1] = len(indices)
+
+    return LinkGraph(filenames, indptr, np.array(indices, dtype=np.int64))
+
+
+def page_links(directory, filename, chunk_size=CHUNK_SIZE):
+    """
+    Return the set of link targets in one HTML file, reading it in chunks.
+    """
+    links = set()
+    with open(os.path.join(directory, filename)) as f:
+        for link in stream_links(f, chunk_size):
+            links.add(link)
+    return links
+
+
+def stream_links(f, chunk_size=CHUNK_SIZE):
+    """
+    Yield every link target in an open HTML file, reading `chunk_size`
+    characters at a time.
+
+    After the last link of a chunk, an "<a" tag that a later chunk could
+    still turn into a link is carried over and parsed together with the
+    next chunk. A tag longer than `MAX_TAG` is dropped instead, so long
+    stretches of text are never copied again and again.
+    """
+    tail = ""
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        text = tail + chunk
+        end = 0
+        for match in LINK.finditer(text):
+            yield match.group(1)
+            end = match.end()
+        cut = _unfinished_tag(text, end)
+        tail = text[cut:] if cut is not None and len(text) - cut <= MAX_TAG else ""
+
+    for match in LINK.finditer(tail):
+        yield match.group(1)
+
+
+def _unfinished_tag(text, start):
+    """
+    Return the position of the first "<a" from `start` on in `text` that more
+    text could still turn into a link, or None if there is none.
+
+    A link needs href=" before the ">" closing its tag, so a tag closed
+    without one is finished; a closing quote may still be missing, which
+    is why any href=" before the first ">" keeps the tag open.
+    """
+    i = text.find("<a", start)
+    while i != -1:
+        after = text[i + 2:i + 3]
+        if not after or after.isspace():
+            close = text.find(">", i)
+            if close == -1 or text.find('href="', i, close) != -1:
+                return i
+        i = text.find("<a", i + 2)
+
+    # A "<" at the very end may be the start of one
+    if text.endswith("<") and len(text) - 1 >= start:
+        return len(text) - 1
+    return None
+
+
+if __name__ == "__main__":
+    main()
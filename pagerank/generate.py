@@ -0,0 +1,147 @@
+import os
+import sys
+
+import numpy as np
+
+from linkgraph import LinkGraph
+
+# Default number of links per page, on average
+LINKS = 8
+
+# Exponent of the power law of in-degrees; higher concentrates links on fewer pages
+EXPONENT = 2.5
+
+# Fraction of pages without any links
+DANGLING = 0.1
+
+# Fraction of links to a page of the same site, and pages per site
+LOCALITY = 0.5
+SITE = 100
+
+# Pages generated at a time, which bounds memory on large corpora
+BLOCK = 100000
+
+# Same layout as the hand-written corpora
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+    <head>
+        <title>{name}</title>
+    </head>
+    <body>
+        <h1>{name}</h1>
+
+        <div>Links:</div>
+        <ul>
+{links}
+        </ul>
+    </body>
+</html>
+"""
+LINK = """            <li><a href="{target}.html">{target}</a></li>"""
+
+
+def main():
+    if len(sys.argv) not in [2, 3, 4]:
+        sys.exit("Usage: python generate.py pages [seed] [directory]")
+    n = int(sys.argv[1])
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    if len(sys.argv) == 4:
+        directory = sys.argv[3]
+        links = write_corpus(directory, n, seed=seed)
+        print(f"Wrote {n} pages and {links} links to {directory}")
+        return
+
+    graph = power_law_graph(n, seed=seed)
+    in_degree = np.bincount(graph.indices, minlength=n)
+    print(f"Pages: {n}")
+    print(f"Links: {len(graph.indices)}")
+    print(f"Pages without links: {int(graph.dangling.sum())}")
+    print(f"Largest in-degree: {int(in_degree.max())}")
+    print(f"Largest out-degree: {int(graph.out_degree.max())}")
+
+
+def power_law_graph(n, links=LINKS, exponent=EXPONENT, dangling=DANGLING,
+                    locality=LOCALITY, site=SITE, seed=None):
+    """
+    Return a random LinkGraph of `n` pages named "0.html", "1.html", ...,
+    whose in-degrees follow a power law, like links on the web do.
+
+    Out-degrees are geometric with mean `links`, except for a `dangling`
+    fraction of pages with none. Link targets are drawn with probability
+    proportional to (popularity rank) ** -(1 / (exponent - 1)), the rank-size
+    form of a power law with that exponent; popularity is shuffled so
+    popular pages are spread over the index range. A `locality` fraction of
+    links instead goes to a random page of the same site of `site`
+    consecutive pages, which gives the graph the loosely connected clusters
+    that slow down power iteration on real corpora. Self-links and duplicate
+    links are dropped.
+    """
+    pages = [f"{i}.html" for i in range(n)]
+    blocks = list(link_blocks(n, links, exponent, dangling, locality, site, seed))
+    sources = np.concatenate([block[0] for block in blocks]) if blocks else np.zeros(0, np.int64)
+    targets = np.concatenate([block[1] for block in blocks]) if blocks else np.zeros(0, np.int64)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=n), out=indptr[1:])
+    return LinkGraph(pages, indptr, targets)
+
+
+def write_corpus(directory, n, links=LINKS, exponent=EXPONENT, dangling=DANGLING,
+                 locality=LOCALITY, site=SITE, seed=None):
+    """
+    Write the corpus of `power_law_graph` (the same one, for the same
+    arguments) as HTML pages in `directory`, `BLOCK` pages at a time.
+    Return the number of links written.
+    """
+    os.makedirs(directory, exist_ok=True)
+    written = 0
+    first = 0
+    for sources, targets in link_blocks(n, links, exponent, dangling, locality, site, seed):
+        count = min(BLOCK, n - first)
+        bounds = np.searchsorted(sources, np.arange(first, first + count + 1))
+        names = targets.tolist()
+        for i in range(count):
+            page = first + i
+            html = PAGE.format(name=page, links="\n".join(
+                LINK.format(target=target) for target in names[bounds[i]:bounds[i + 1]]
+            ))
+            with open(os.path.join(directory, f"{page}.html"), "w") as f:
+                f.write(html)
+        written += len(targets)
+        first += count
+    return written
+
+
+def link_blocks(n, links=LINKS, exponent=EXPONENT, dangling=DANGLING,
+                locality=LOCALITY, site=SITE, seed=None):
+    """
+    Yield the links of the `power_law_graph` corpus, `BLOCK` source pages at
+    a time, as (sources, targets) arrays sorted by source, then target.
+    """
+    rng = np.random.default_rng(seed)
+
+    # Inverse transform sampling of the rank-size law, over a random popularity order
+    weights = np.arange(1, n + 1, dtype=np.float64) ** (-1 / (exponent - 1))
+    cumulative = np.cumsum(weights)
+    popular = rng.permutation(n)
+
+    for first in range(0, n, BLOCK):
+        count = min(BLOCK, n - first)
+        out_degree = rng.geometric(1 / links, size=count)
+        out_degree[rng.random(count) < dangling] = 0
+        sources = np.repeat(np.arange(first, first + count), out_degree)
+
+        targets = popular[np.searchsorted(cumulative, rng.random(len(sources)) * cumulative[-1])]
+        local = rng.random(len(sources)) < locality
+        start = sources[local] // site * site
+        targets[local] = np.minimum(start + rng.integers(0, site, local.sum()), n - 1)
+
+        # Sort by (source, target), dropping duplicates and self-links
+        keys = np.unique(sources * n + targets)
+        sources, targets = np.divmod(keys, n)
+        keep = sources != targets
+        yield sources[keep], targets[keep]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import numpy as np
+
+from linkgraph import LinkGraph
+from pagerank import DAMPING
+from power import MAX_ITERATIONS, power_iteration
+
+# Default convergence threshold on the largest change of any page's rank;
+# tighter than `power.TOLERANCE`, since ranks are small on large corpora
+TOLERANCE = 1e-10
+
+# Links are kept as keys `source << SHIFT | target`, so sorted keys are
+# sorted by source then target whatever the number of pages
+SHIFT = 32
+
+
+class IncrementalPageRank():
+    """
+    PageRank of a corpus that keeps changing.
+
+    Pages and links can be added and removed between calls to `update`.
+    Links are kept as a sorted array of keys, and `update` merges only the
+    pending changes into it, instead of crawling the corpus again or
+    re-sorting every link. Power iteration then starts from the previous
+    ranks rather than from 1/N, so it only has to correct the error
+    introduced by the changes.
+    """
+    def __init__(self, corpus, damping_factor=DAMPING, tolerance=TOLERANCE,
+                 max_iterations=MAX_ITERATIONS):
+        self.damping_factor = damping_factor
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+
+        graph = LinkGraph.from_corpus(corpus)
+        self.pages = list(graph.pages)
+        self.index = dict(graph.index)
+        self.alive = np.ones(len(self.pages), dtype=bool)
+        self.keys = graph.sources.astype(np.int64) << SHIFT | graph.indices.astype(np.int64)
+
+        # Link changes not yet applied to the keys, as (source, target) indices,
+        # and pages removed since, whose links are still in the keys
+        self.added = set()
+        self.removed = set()
+        self.dropped = set()
+
+        # Graph of the last update, reused while the set of pages is unchanged
+        self.graph = graph
+        self.pages_changed = False
+
+        # Rank of every page ever seen (0 for removed ones), None before the first update
+        self.ranks = None
+
+        # Iterations run by the last update
+        self.iterations = 0
+
+        # Whether pages or links changed since the last update
+        self.changed = True
+
+    def add_page(self, page, links=()):
+        """
+        Add a page, with links to other pages already in the corpus.
+        """
+        if page in self.index and self.alive[self.index[page]]:
+            raise ValueError(f"page already in corpus: {page}")
+        if page not in self.index:
+            self.index[page] = len(self.pages)
+            self.pages.append(page)
+            self.alive = np.append(self.alive, True)
+            if self.ranks is not None:
+                self.ranks = np.append(self.ranks, 0.0)
+        self.alive[self.index[page]] = True
+        self.changed = True
+        self.pages_changed = True
+        for link in links:
+            self.add_link(page, link)
+
+    def remove_page(self, page):
+        """
+        Remove a page, together with every link from or to it.
+        """
+        i = self._page(page)
+        self.alive[i] = False
+        self.dropped.add(i)
+        self.added = {link for link in self.added if i not in link}
+        self.removed = {link for link in self.removed if i not in link}
+        self.changed = True
+        self.pages_changed = True
+
+    def add_link(self, page, target):
+        """
+        Add a link from `page` to `target`; links to itself are ignored, as in `crawl`.
+        """
+        link = (self._page(page), self._page(target))
+        if link[0] != link[1]:
+            self.removed.discard(link)
+            self.added.add(link)
+            self.changed = True
+
+    def remove_link(self, page, target):
+        """
+        Remove the link from `page` to `target`, if there is one.
+        """
+        link = (self._page(page), self._page(target))
+        self.added.discard(link)
+        self.removed.add(link)
+        self.changed = True
+
+    def update(self):
+        """
+        Apply the pending changes and return the new PageRank values
+        as a {page: rank} dictionary.
+        """
+        if not self.changed:
+            self.iterations = 0
+            return self.graph.to_dict(self.ranks[self.alive])
+        self._apply()
+
+        # Graph over the pages still in the corpus, renumbered without the removed ones
+        alive = np.flatnonzero(self.alive)
+        sources = self.keys >> SHIFT
+        targets = self.keys & ((1 << SHIFT) - 1)
+        if len(alive) < len(self.alive):
+            compact = np.cumsum(self.alive) - 1
+            sources = compact[sources]
+            targets = compact[targets]
+        if self.pages_changed:
+            pages, index = [self.pages[i] for i in alive.tolist()], None
+        else:
+            pages, index = self.graph.pages, self.graph.index
+        indptr = np.zeros(len(alive) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(alive)), out=indptr[1:])
+        self.graph = LinkGraph(pages, indptr, targets, index)
+        self.pages_changed = False
+
+        ranks = None
+        if self.ranks is not None:
+            # Warm start: previous ranks, with new pages at 1/N, rescaled to sum to 1
+            ranks = self.ranks[alive].copy()
+            ranks[ranks == 0] = 1 / len(alive)
+            ranks /= ranks.sum()
+        ranks, self.iterations = power_iteration(
+            self.graph, self.damping_factor, self.tolerance, self.max_iterations, ranks
+        )
+        self.ranks = np.zeros(len(self.pages))
+        self.ranks[alive] = ranks
+        self.changed = False
+        return self.graph.to_dict(ranks)
+
+    def _apply(self):
+        """
+        Merge the pending changes into the sorted link keys, touching
+        only the keys that change apart from one copy of the array.
+        """
+        keys = self.keys
+        if self.dropped:
+            dropped = np.array(sorted(self.dropped), dtype=np.int64)
+            keys = keys[~(np.isin(keys >> SHIFT, dropped) |
+                          np.isin(keys & ((1 << SHIFT) - 1), dropped))]
+        if self.removed:
+            removed = np.unique(np.array([s << SHIFT | t for s, t in self.removed], dtype=np.int64))
+            positions = np.searchsorted(keys, removed)
+            found = positions < len(keys)
+            found[found] = keys[positions[found]] == removed[found]
+            keys = np.delete(keys, positions[found])
+        if self.added:
+            added = np.unique(np.array([s << SHIFT | t for s, t in self.added], dtype=np.int64))
+            positions = np.searchsorted(keys, added)
+            new = positions == len(keys)
+            new[~new] = keys[positions[~new]] != added[~new]
+            keys = np.insert(keys, positions[new], added[new])
+        self.keys = keys
+        self.added = set()
+        self.removed = set()
+        self.dropped = set()
+
+    def _page(self, page):
+        if page not in self.index or not self.alive[self.index[page]]:
+            raise KeyError(page)
+        return self.index[page]
@@ -0,0 +1,65 @@
+import numpy as np
+
+
+class LinkGraph():
+    """
+    Link graph of a corpus, with page names interned to integers.
+
+    The links of page `i` are `indices[indptr[i]:indptr[i + 1]]`. The same
+    links are also kept as a sparse transition matrix in coordinate form:
+    following link `e` moves `weights[e]` of the rank of page `sources[e]`
+    to page `indices[e]`.
+    """
+    def __init__(self, pages, indptr, indices, index=None):
+        self.pages = pages
+        self.indptr = indptr
+        self.indices = indices
+
+        # Maps page names back to their integer index; a graph over the same
+        # pages may pass its own, since building it dominates small updates
+        self.index = index if index is not None else {page: i for i, page in enumerate(pages)}
+
+        self.out_degree = np.diff(indptr)
+        self.dangling = self.out_degree == 0
+        self.sources = np.repeat(np.arange(len(pages)), self.out_degree)
+        self.weights = 1 / self.out_degree[self.sources] if len(self.sources) else np.zeros(0)
+
+    def __len__(self):
+        return len(self.pages)
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        """
+        Build a graph from a corpus dict, as returned by `crawl`.
+        """
+        pages = sorted(corpus)
+        index = {page: i for i, page in enumerate(pages)}
+        indptr = np.zeros(len(pages) + 1, dtype=np.int64)
+        indices = []
+        for i, page in enumerate(pages):
+            indices.extend(sorted(index[link] for link in corpus[page] if link in index))
+            indptr[i + 1] = len(indices)
+        return cls(pages, indptr, np.array(indices, dtype=np.int64))
+
+    def to_corpus(self):
+        """
+        Return the graph as a corpus dict, as returned by `crawl`.
+        """
+        return {
+            page: {self.pages[j] for j in self.indices[self.indptr[i]:self.indptr[i + 1]].tolist()}
+            for i, page in enumerate(self.pages)
+        }
+
+    def spread(self, ranks):
+        """
+        Return, for every page, the rank flowing into it through links:
+        the sum of rank(i) / links(i) over every page i linking to it.
+        """
+        return np.bincount(self.indices, weights=ranks[self.sources] * self.weights,
+                           minlength=len(self.pages))
+
+    def to_dict(self, ranks):
+        """
+        Return a vector of ranks as a {page: rank} dictionary.
+        """
+        return dict(zip(self.pages, ranks.tolist()))
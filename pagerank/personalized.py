@@ -0,0 +1,139 @@
+import sys
+from collections import deque
+
+import numpy as np
+
+from crawler import crawl_graph
+from pagerank import DAMPING
+from power import MAX_ITERATIONS, TOLERANCE
+
+# Default residual threshold per link of `push`
+EPSILON = 1e-6
+
+# Number of pages listed per seed
+TOP = 5
+
+
+def main():
+    args = sys.argv[1:]
+    local = "--push" in args
+    if local:
+        args.remove("--push")
+    if len(args) < 2:
+        sys.exit("Usage: python personalized.py corpus page [page ...] [--push]")
+    graph = crawl_graph(args[0])
+    seeds = args[1:]
+    for seed in seeds:
+        if seed not in graph.index:
+            sys.exit(f"Page not in corpus: {seed}")
+
+    if local:
+        results = [push(graph, seed, DAMPING) for seed in seeds]
+    else:
+        ranks = personalized_pagerank(graph, [teleport_vector(graph, [seed]) for seed in seeds],
+                                      DAMPING)
+        results = [graph.to_dict(row) for row in ranks]
+    for seed, result in zip(seeds, results):
+        print(f"PageRank Results teleporting to {seed}")
+        for page, rank in sorted(result.items(), key=lambda item: -item[1])[:TOP]:
+            print(f"  {page}: {rank:.4f}")
+
+
+def teleport_vector(graph, pages, weights=None):
+    """
+    Return a teleport vector of a LinkGraph that jumps to one of `pages`,
+    uniformly or in proportion to `weights`.
+    """
+    teleport = np.zeros(len(graph))
+    indices = [graph.index[page] for page in pages]
+    np.add.at(teleport, indices, 1 if weights is None else np.asarray(weights, dtype=np.float64))
+    return teleport / teleport.sum()
+
+
+def topic_pagerank(graph, topics, damping_factor=DAMPING, tolerance=TOLERANCE,
+                   max_iterations=MAX_ITERATIONS):
+    """
+    Return the topic-sensitive PageRank of a LinkGraph for every topic
+    in `topics`, a dict mapping a topic to the pages about it,
+    as a {topic: {page: rank}} dictionary.
+    """
+    ranks = personalized_pagerank(
+        graph, [teleport_vector(graph, pages) for pages in topics.values()],
+        damping_factor, tolerance, max_iterations,
+    )
+    return {topic: graph.to_dict(row) for topic, row in zip(topics, ranks)}
+
+
+def personalized_pagerank(graph, teleports, damping_factor=DAMPING, tolerance=TOLERANCE,
+                          max_iterations=MAX_ITERATIONS):
+    """
+    Return the personalized PageRank of a LinkGraph for every teleport
+    vector in `teleports`, as an array whose row i holds the ranks for
+    `teleports[i]`.
+
+    With probability 1 - `damping_factor`, and from pages without links,
+    the surfer jumps to a page drawn from the teleport vector instead of a
+    uniformly random one. All vectors are iterated together, as one matrix,
+    until none of their ranks changes by `tolerance` or more; vectors that
+    converge early drop out of the iteration.
+    """
+    teleports = np.atleast_2d(np.asarray(teleports, dtype=np.float64))
+    ranks = teleports.copy()
+    active = np.arange(len(ranks))
+    for _ in range(max_iterations):
+        if not len(active):
+            break
+        block = ranks[active]
+        teleport = teleports[active]
+        dangling = block[:, graph.dangling].sum(axis=1, keepdims=True)
+
+        # One `spread` per vector: bincount over contiguous rows beats
+        # two-dimensional gathers and segment sums, which NumPy does poorly
+        spread = np.stack([graph.spread(row) for row in block])
+        new_block = (1 - damping_factor) * teleport + damping_factor * (spread + dangling * teleport)
+        delta = np.abs(new_block - block).max(axis=1)
+        ranks[active] = new_block
+        active = active[delta >= tolerance]
+    return ranks
+
+
+def push(graph, seed, damping_factor=DAMPING, epsilon=EPSILON):
+    """
+    Approximate the personalized PageRank of a single `seed` page
+    without touching the rest of the corpus (Andersen, Chung and Lang).
+
+    Starting with all of the rank left to distribute at the seed, every page
+    whose residual reaches `epsilon` per link keeps 1 - `damping_factor`
+    of it and passes the rest on evenly through its links; pages without
+    links pass it back to the seed. Ranks are never overestimated, and the
+    total rank still missing is the residual left over, which is below
+    `epsilon` per link (or `epsilon`, without links) on every page.
+    Return the pages reached, as a {page: rank} dictionary.
+    """
+    indptr = graph.indptr
+    indices = graph.indices
+    start = graph.index[seed]
+
+    ranks = {}
+    residual = {start: 1.0}
+    queue = deque([start])
+    while queue:
+        page = queue.popleft()
+        r = residual[page]
+        degree = int(indptr[page + 1] - indptr[page])
+        if r < epsilon * max(degree, 1):
+            continue
+        ranks[page] = ranks.get(page, 0.0) + (1 - damping_factor) * r
+        residual[page] = 0.0
+        targets = indices[indptr[page]:indptr[page + 1]].tolist() if degree else [start]
+        share = damping_factor * r / len(targets)
+        for target in targets:
+            residual[target] = residual.get(target, 0.0) + share
+            limit = epsilon * max(int(indptr[target + 1] - indptr[target]), 1)
+            if residual[target] >= limit and residual[target] - share < limit:
+                queue.append(target)
+    return {graph.pages[page]: rank for page, rank in ranks.items()}
+
+
+if __name__ == "__main__":
+    main()
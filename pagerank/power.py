@@ -0,0 +1,79 @@
+import sys
+
+import numpy as np
+
+from linkgraph import LinkGraph
+from pagerank import DAMPING, crawl
+
+# Default convergence threshold on the largest change of any page's rank
+TOLERANCE = 0.001
+
+# Default cap on the number of iterations
+MAX_ITERATIONS = 1000
+
+
+def main():
+    if len(sys.argv) not in [2, 3, 4]:
+        sys.exit("Usage: python power.py corpus [tolerance] [max_iterations]")
+    tolerance = float(sys.argv[2]) if len(sys.argv) > 2 else TOLERANCE
+    max_iterations = int(sys.argv[3]) if len(sys.argv) > 3 else MAX_ITERATIONS
+
+    graph = LinkGraph.from_corpus(crawl(sys.argv[1]))
+    ranks, iterations = power_iteration(graph, DAMPING, tolerance, max_iterations)
+    print(f"PageRank Results from Power Iteration ({iterations} iterations)")
+    for page, rank in sorted(graph.to_dict(ranks).items()):
+        print(f"  {page}: {rank:.4f}")
+
+
+def iterate_pagerank_sparse(corpus, damping_factor, tolerance=TOLERANCE,
+                            max_iterations=MAX_ITERATIONS):
+    """
+    Return PageRank values for each page by power iteration on
+    the sparse transition matrix of `corpus`.
+
+    Return a dictionary where keys are page names, and values are
+    their estimated PageRank value (a value between 0 and 1). All
+    PageRank values should sum to 1.
+    """
+    graph = LinkGraph.from_corpus(corpus)
+    ranks, _ = power_iteration(graph, damping_factor, tolerance, max_iterations)
+    return graph.to_dict(ranks)
+
+
+def power_iteration(graph, damping_factor, tolerance=TOLERANCE,
+                    max_iterations=MAX_ITERATIONS, ranks=None):
+    """
+    Run power iteration on a LinkGraph, starting from `ranks`
+    (uniform if not given), until no page's rank changes by `tolerance`
+    or more, or `max_iterations` is reached.
+
+    A page with no links is interpreted as having one link to every page,
+    so its rank is spread evenly over the whole corpus.
+    Return the rank vector and the number of iterations run.
+    """
+    n = len(graph)
+    if ranks is None:
+        ranks = np.full(n, 1 / n)
+
+    iterations = 0
+    while iterations < max_iterations:
+        new_ranks = step(graph, ranks, damping_factor)
+        iterations += 1
+        delta = np.abs(new_ranks - ranks).max()
+        ranks = new_ranks
+        if delta < tolerance:
+            break
+    return ranks, iterations
+
+
+def step(graph, ranks, damping_factor):
+    """
+    Apply the PageRank formula once to the rank vector `ranks`.
+    """
+    n = len(graph)
+    dangling = ranks[graph.dangling].sum()
+    return (1 - damping_factor) / n + damping_factor * (graph.spread(ranks) + dangling / n)
+
+
+if __name__ == "__main__":
+    main()
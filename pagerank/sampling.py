@@ -0,0 +1,217 @@
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from linkgraph import LinkGraph
+from pagerank import DAMPING, SAMPLES, crawl
+
+# Number of random walkers advanced together by default
+WALKERS = 10000
+
+# Weight of its starting page a walk may keep once it starts being sampled
+BIAS = 1e-4
+
+# Upper bound on the unsampled steps at the start of each walk
+BURN_IN_CAP = 1000
+
+# Normal quantile of the reported confidence intervals (95%)
+Z = 1.96
+
+# Jobs per worker in each round of parallel sampling
+JOBS_PER_WORKER = 4
+
+# LinkGraph used by the worker processes
+_graph = None
+
+
+def main():
+    args = sys.argv[1:]
+    workers = None
+    if "--workers" in args:
+        i = args.index("--workers")
+        try:
+            workers = int(args[i + 1])
+        except (IndexError, ValueError):
+            sys.exit("--workers expects a number")
+        del args[i:i + 2]
+    if len(args) not in [1, 2]:
+        sys.exit("Usage: python sampling.py corpus [samples] [--workers N]")
+    n = int(args[1]) if len(args) == 2 else SAMPLES
+
+    corpus = crawl(args[0])
+    start = time.perf_counter()
+    if workers is None:
+        ranks = sample_pagerank_fast(corpus, DAMPING, n)
+        intervals = None
+    else:
+        # Confidence intervals need at least two jobs of one sample
+        n = max(2, n)
+        results = parallel_sample_pagerank(corpus, DAMPING, n, workers)
+        ranks = {page: rank for page, (rank, _) in results.items()}
+        intervals = {page: width for page, (_, width) in results.items()}
+    elapsed = time.perf_counter() - start
+    print(f"PageRank Results from Sampling (n = {n}, {elapsed:.2f}s)")
+    for page in sorted(ranks):
+        if intervals is None:
+            print(f"  {page}: {ranks[page]:.4f}")
+        else:
+            print(f"  {page}: {ranks[page]:.4f} +/- {intervals[page]:.4f}")
+
+
+def sample_pagerank_fast(corpus, damping_factor, n, walkers=WALKERS, seed=None):
+    """
+    Return PageRank values for each page by sampling `n` pages
+    with many random walkers advanced together, each starting at a random page.
+
+    Return a dictionary where keys are page names, and values are
+    their estimated PageRank value (a value between 0 and 1). All
+    PageRank values should sum to 1.
+    """
+    graph = LinkGraph.from_corpus(corpus)
+    counts = random_walks(graph, damping_factor, n, walkers, np.random.default_rng(seed))
+    return graph.to_dict(counts / n)
+
+
+def random_walks(graph, damping_factor, n, walkers, rng):
+    """
+    Take `n` samples in total from `walkers` random walks on a LinkGraph,
+    and return how many times each page was sampled.
+
+    Links are unweighted, so the CSR offsets of the graph are all the
+    precomputed tables needed: following a random link of page `p` is
+    `indices[indptr[p] + k]` for a uniform `k` below its out-degree.
+
+    Every walk starts at a random page and takes a few unsampled steps
+    first, so that short walks are not biased towards their starting page.
+    """
+    pages = len(graph)
+    counts = np.zeros(pages, dtype=np.int64)
+    walkers = max(1, min(walkers, n))
+
+    positions = rng.integers(pages, size=walkers)
+    for _ in range(burn_in(damping_factor)):
+        positions = _advance(graph, positions, damping_factor, rng)
+
+    remaining = n
+    while remaining > 0:
+        # The last round only counts as many walkers as samples are left
+        counted = positions[:remaining]
+        counts += np.bincount(counted, minlength=pages)
+        remaining -= len(counted)
+        if remaining > 0:
+            positions = _advance(graph, positions, damping_factor, rng)
+    return counts
+
+
+def burn_in(damping_factor):
+    """
+    Return the number of steps after which a walk has forgotten its
+    starting page up to BIAS: every step jumps to a random page with
+    probability `1 - damping_factor`.
+    """
+    if damping_factor <= 0:
+        return 0
+    if damping_factor >= 1:
+        return BURN_IN_CAP
+    return min(BURN_IN_CAP, math.ceil(math.log(BIAS) / math.log(damping_factor)))
+
+
+def _advance(graph, positions, damping_factor, rng):
+    """
+    Move every walker one step: with probability `damping_factor`
+    follow a random link, otherwise jump to a random page.
+    """
+    pages = len(graph)
+    degree = graph.out_degree[positions]
+    offset = (rng.random(len(positions)) * degree).astype(np.int64)
+
+    # Pages with no links always jump; the clip keeps their unused link lookup in range
+    if len(graph.indices):
+        followed = graph.indices[np.minimum(graph.indptr[positions] + offset, len(graph.indices) - 1)]
+    else:
+        followed = positions
+    jump = (rng.random(len(positions)) >= damping_factor) | (degree == 0)
+    return np.where(jump, rng.integers(pages, size=len(positions)), followed)
+
+
+def parallel_sample_pagerank(corpus, damping_factor, n, workers=None, seed=None,
+                             tolerance=None, max_samples=None):
+    """
+    Return PageRank estimates for each page by sampling across `workers`
+    processes, each job drawing from its own independently seeded stream.
+
+    Sampling runs in rounds of `n` samples (at least 2) split into jobs
+    whose sizes differ by at most one. Every job is an independent
+    estimate, so their spread gives a 95% confidence interval for each
+    page. Without `tolerance` a single round is run; otherwise rounds
+    continue until every interval half-width is below `tolerance`, or
+    `max_samples` (default 100 * n) have been drawn.
+
+    Return a dictionary where keys are page names, and values are
+    (rank, half-width of the confidence interval) pairs.
+    """
+    graph = LinkGraph.from_corpus(corpus)
+    workers = workers or os.cpu_count()
+    n = max(2, n)
+    jobs = max(2, min(workers * JOBS_PER_WORKER, n))
+    sizes = [n // jobs + (i < n % jobs) for i in range(jobs)]
+    if max_samples is None:
+        max_samples = 100 * n
+    streams = np.random.SeedSequence(seed)
+
+    estimates = []
+    total = np.zeros(len(graph))
+    drawn = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(graph,)) as executor:
+        while True:
+            seeds = streams.spawn(jobs)
+            tasks = [(damping_factor, size, seed) for size, seed in zip(sizes, seeds)]
+            for size, counts in zip(sizes, executor.map(_sample_job, tasks)):
+                estimates.append(counts / size)
+                total += counts
+            drawn += n
+
+            # Jobs are nearly equal, so their estimates are weighed alike in the spread
+            _, widths = _confidence(np.array(estimates))
+            if tolerance is None or widths.max() < tolerance:
+                break
+            if drawn >= max_samples:
+                break
+
+    ranks = total / drawn
+    return {
+        page: (rank, width)
+        for page, rank, width in zip(graph.pages, ranks.tolist(), widths.tolist())
+    }
+
+
+def _confidence(estimates):
+    """
+    Return the mean of independent rank estimates (one per row)
+    and the half-width of its confidence interval.
+    """
+    ranks = estimates.mean(axis=0)
+    widths = Z * estimates.std(axis=0, ddof=1) / np.sqrt(len(estimates))
+    return ranks, widths
+
+
+def _init_worker(graph):
+    global _graph
+    _graph = graph
+
+
+def _sample_job(task):
+    """
+    Return the page counts of one job of random walks.
+    """
+    damping_factor, size, seed = task
+    return random_walks(_graph, damping_factor, size, WALKERS, np.random.default_rng(seed))
+
+
+if __name__ == "__main__":
+    main()
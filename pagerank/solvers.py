@@ -0,0 +1,194 @@
+import numpy as np
+
+from pagerank import DAMPING
+from power import MAX_ITERATIONS, TOLERANCE, step
+
+# Iterations between two extrapolations
+PERIOD = 10
+
+# Norms the residual can be measured in
+NORMS = {
+    "l1": lambda v: np.abs(v).sum(),
+    "inf": lambda v: np.abs(v).max() if len(v) else 0.0,
+}
+
+
+class Solution():
+    """
+    PageRank values of a LinkGraph, and how the solver got there:
+    `residuals[k]` is the norm of the change made by iteration k + 1.
+    """
+    def __init__(self, graph, ranks, residuals, tolerance):
+        self.graph = graph
+        self.ranks = ranks
+        self.residuals = residuals
+        self.converged = bool(residuals) and residuals[-1] < tolerance
+
+    @property
+    def iterations(self):
+        return len(self.residuals)
+
+    def to_dict(self):
+        return self.graph.to_dict(self.ranks)
+
+
+def solve(graph, damping_factor=DAMPING, method="power", tolerance=TOLERANCE,
+          norm="inf", max_iterations=MAX_ITERATIONS, ranks=None):
+    """
+    Compute the PageRank of a LinkGraph with one of the `METHODS`,
+    starting from `ranks` (1/N for every page by default).
+
+    Stop once an iteration changes the rank vector by less than `tolerance`,
+    measured in the `norm` of `NORMS`: "inf" bounds the change of any single
+    page, like `iterate_pagerank`, while "l1" bounds the total change.
+    Return a Solution.
+    """
+    if method not in METHODS:
+        raise ValueError(f"unknown method: {method}")
+    if norm not in NORMS:
+        raise ValueError(f"unknown norm: {norm}")
+    n = len(graph)
+    if ranks is None:
+        ranks = np.full(n, 1 / n)
+    measure = NORMS[norm]
+    iterate = METHODS[method](graph, damping_factor)
+
+    residuals = []
+    while len(residuals) < max_iterations:
+        new_ranks = iterate(ranks)
+        residuals.append(float(measure(new_ranks - ranks)))
+        ranks = new_ranks
+        if residuals[-1] < tolerance:
+            break
+    return Solution(graph, ranks, residuals, tolerance)
+
+
+def power(graph, damping_factor):
+    """
+    Return the iteration function of plain power iteration.
+    """
+    return lambda ranks: step(graph, ranks, damping_factor)
+
+
+def gauss_seidel(graph, damping_factor):
+    """
+    Return the iteration function of Gauss-Seidel.
+
+    Pages are updated one at a time, in index order, and each update
+    already uses the new ranks of the pages updated before it. This
+    usually converges in fewer iterations than power iteration, but the
+    loop over pages is sequential, so it runs in pure Python.
+    """
+    n = len(graph)
+
+    # Links grouped by target: page i receives rank from in_sources[in_indptr[i]:in_indptr[i + 1]]
+    order = np.argsort(graph.indices, kind="stable")
+    in_indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(graph.indices, minlength=n), out=in_indptr[1:])
+    in_indptr = in_indptr.tolist()
+    in_sources = graph.sources[order].tolist()
+    in_weights = graph.weights[order].tolist()
+    dangling = graph.dangling.tolist()
+    teleport = (1 - damping_factor) / n
+
+    def iterate(ranks):
+        ranks = ranks.tolist()
+
+        # Rank of pages without links, spread evenly over every page
+        mass = sum(rank for rank, empty in zip(ranks, dangling) if empty)
+        for i in range(n):
+            incoming = sum(
+                ranks[in_sources[e]] * in_weights[e]
+                for e in range(in_indptr[i], in_indptr[i + 1])
+            )
+            new_rank = teleport + damping_factor * (incoming + mass / n)
+            if dangling[i]:
+                mass += new_rank - ranks[i]
+            ranks[i] = new_rank
+        ranks = np.array(ranks)
+        return ranks / ranks.sum()
+
+    return iterate
+
+
+def aitken(graph, damping_factor, period=PERIOD):
+    """
+    Return the iteration function of power iteration with Aitken
+    extrapolation every `period` iterations.
+
+    Extrapolation assumes the error of every page shrinks geometrically,
+    and jumps each rank to the limit of its last three iterates. Ranks
+    that oscillate or do not shrink steadily are left alone.
+    """
+    history = []
+    count = 0
+
+    def iterate(ranks):
+        nonlocal count
+        count += 1
+        new_ranks = step(graph, ranks, damping_factor)
+        history[:] = (history + [new_ranks])[-3:]
+        if len(history) == 3 and count % period == 0:
+            x0, x1, x2 = history
+            first, second = x1 - x0, x2 - x1
+
+            # Only extrapolate pages whose rank converges monotonically
+            safe = (first * second > 0) & (np.abs(second) < np.abs(first))
+            extrapolated = x2.copy()
+            extrapolated[safe] -= second[safe] ** 2 / (second - first)[safe]
+            new_ranks = _normalize(extrapolated, x2)
+            history.clear()
+        return new_ranks
+
+    return iterate
+
+
+def quadratic(graph, damping_factor, period=PERIOD):
+    """
+    Return the iteration function of power iteration with quadratic
+    extrapolation every `period` iterations.
+
+    Extrapolation assumes the last four iterates are a combination of the
+    limit and the two slowest-decaying error components, and solves a
+    small least-squares problem to subtract both.
+    """
+    history = []
+    count = 0
+
+    def iterate(ranks):
+        nonlocal count
+        count += 1
+        new_ranks = step(graph, ranks, damping_factor)
+        history[:] = (history + [new_ranks])[-4:]
+        if len(history) == 4 and count % period == 0:
+            x0, x1, x2, x3 = history
+            y = np.column_stack([x1 - x0, x2 - x0])
+            gamma1, gamma2 = -np.linalg.lstsq(y, x3 - x0, rcond=None)[0]
+            gamma3 = 1.0
+            extrapolated = (gamma1 + gamma2 + gamma3) * x1 + (gamma2 + gamma3) * x2 + gamma3 * x3
+            new_ranks = _normalize(extrapolated, x3)
+            history.clear()
+        return new_ranks
+
+    return iterate
+
+
+def _normalize(extrapolated, fallback):
+    """
+    Return an extrapolated rank vector as a probability distribution,
+    or `fallback` if extrapolation went wrong.
+    """
+    extrapolated = np.clip(extrapolated, 0, None)
+    total = extrapolated.sum()
+    if not np.isfinite(total) or total <= 0:
+        return fallback
+    return extrapolated / total
+
+
+# Solvers `solve` can use, by name
+METHODS = {
+    "power": power,
+    "gauss-seidel": gauss_seidel,
+    "aitken": aitken,
+    "quadratic": quadratic,
+}
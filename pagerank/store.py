@@ -0,0 +1,245 @@
+import os
+import sys
+from bisect import bisect_left
+
+import numpy as np
+
+from crawler import crawl_graph
+from linkgraph import LinkGraph
+from pagerank import DAMPING
+from power import MAX_ITERATIONS, power_iteration
+
+# Stores live in this subdirectory of the corpus directory
+STORE = "snapshot"
+
+# Written last, so its modification time tells when the store was completed
+MANIFEST = "MANIFEST"
+
+# Bumped whenever the on-disk layout changes
+VERSION = "1"
+
+# Convergence threshold of the stored ranks
+TOLERANCE = 1e-10
+
+# Number of pages listed by default
+TOP = 10
+
+# Integer and float arrays of the store
+ARRAYS = ["indptr", "indices", "ranks", "order"]
+
+
+def main():
+    args = sys.argv[1:]
+    k = TOP
+    if "--top" in args:
+        i = args.index("--top")
+        try:
+            k = int(args[i + 1])
+        except (IndexError, ValueError):
+            sys.exit("--top expects a number")
+        del args[i:i + 2]
+    if not args:
+        sys.exit("Usage: python store.py corpus [page ...] [--top K]")
+    directory, pages = args[0], args[1:]
+
+    if not store_is_fresh(directory):
+        print("Building store...")
+        write_store(directory)
+    store = RankStore(directory)
+
+    if pages:
+        for page in pages:
+            try:
+                print(f"  {page}: {store.rank(page):.4f}")
+            except KeyError:
+                print(f"  {page}: not in corpus")
+        return
+    print(f"Top {min(k, len(store))} of {len(store)} pages")
+    for page, rank in store.top(k):
+        print(f"  {page}: {rank:.4f}")
+
+
+def store_is_fresh(directory):
+    """
+    Return True if `directory` holds a complete store that is newer than
+    every HTML page, and than the last page added to or removed from it.
+    """
+    manifest = os.path.join(directory, STORE, MANIFEST)
+    try:
+        with open(manifest) as f:
+            if f.readline().strip() != VERSION:
+                return False
+        built = os.path.getmtime(manifest)
+    except OSError:
+        return False
+    return os.path.getmtime(directory) <= built and all(
+        os.path.getmtime(os.path.join(directory, filename)) <= built
+        for filename in os.listdir(directory)
+        if filename.endswith(".html")
+    )
+
+
+def write_store(directory, graph=None, ranks=None, damping_factor=DAMPING):
+    """
+    Write the link graph of the corpus in `directory` and its PageRank values
+    as a store inside `directory`.
+
+    The corpus is crawled and ranked first, unless `graph` (a LinkGraph)
+    and its `ranks` are given.
+    """
+    path = os.path.join(directory, STORE)
+    os.makedirs(path, exist_ok=True)
+
+    # Invalidate any previous store before overwriting its files
+    if os.path.exists(os.path.join(path, MANIFEST)):
+        os.remove(os.path.join(path, MANIFEST))
+
+    if graph is None:
+        graph = crawl_graph(directory)
+    if ranks is None:
+        ranks, _ = power_iteration(graph, damping_factor, TOLERANCE, MAX_ITERATIONS)
+
+    # Lookups bisect the page names, so they are stored sorted
+    pages, indptr, indices, ranks = _sorted_by_name(graph, ranks)
+
+    # Pages by decreasing rank, ties by name, so top-k is a prefix
+    order = np.lexsort((np.arange(len(pages)), -ranks))
+
+    columns = {
+        "indptr": np.asarray(indptr, dtype=np.int64),
+        "indices": np.asarray(indices, dtype=np.int64),
+        "ranks": np.asarray(ranks, dtype=np.float64),
+        "order": order.astype(np.int64),
+    }
+    for name, array in columns.items():
+        np.save(os.path.join(path, f"{name}.npy"), array)
+
+    # Page names are sorted, stored as one UTF-8 blob plus offsets
+    encoded = [page.encode("utf-8") for page in pages]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(page) for page in encoded], out=offsets[1:])
+    np.save(os.path.join(path, "pages.npy"), np.frombuffer(b"".join(encoded), dtype=np.uint8))
+    np.save(os.path.join(path, "pages.offsets.npy"), offsets)
+
+    with open(os.path.join(path, MANIFEST), "w") as f:
+        f.write(f"{VERSION}\n{damping_factor}\n")
+
+
+def _sorted_by_name(graph, ranks):
+    """
+    Return the pages, `indptr`, `indices` and `ranks` of `graph` renumbered
+    so that page names are in sorted order, with every page's links sorted.
+    Graphs whose pages are already sorted are returned as they are.
+    """
+    pages = list(graph.pages)
+    if all(a < b for a, b in zip(pages, pages[1:])):
+        return pages, graph.indptr, graph.indices, ranks
+
+    # Page `old[i]` becomes page `i`, and page `j` becomes page `new[j]`
+    old = np.array(sorted(range(len(pages)), key=pages.__getitem__), dtype=np.int64)
+    new = np.empty_like(old)
+    new[old] = np.arange(len(old))
+
+    sources = new[graph.sources]
+    targets = new[graph.indices]
+    links = np.lexsort((targets, sources))
+    indptr = np.zeros(len(pages) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=len(pages)), out=indptr[1:])
+    return [pages[i] for i in old], indptr, targets[links], np.asarray(ranks)[old]
+
+
+class RankStore():
+    """
+    Read-only view of the store inside a corpus directory,
+    with its arrays memory-mapped rather than read into memory.
+    """
+    def __init__(self, directory):
+        path = os.path.join(directory, STORE)
+        with open(os.path.join(path, MANIFEST)) as f:
+            f.readline()
+            self.damping_factor = float(f.readline())
+
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+            for name in ARRAYS
+        }
+        self.indptr = arrays["indptr"]
+        self.indices = arrays["indices"]
+        self.ranks = arrays["ranks"]
+        self.order = arrays["order"]
+        self.pages = StringTable(
+            np.load(os.path.join(path, "pages.npy"), mmap_mode="r"),
+            np.load(os.path.join(path, "pages.offsets.npy"), mmap_mode="r"),
+        )
+
+    def __len__(self):
+        return len(self.pages)
+
+    def __contains__(self, page):
+        return self.find(page) is not None
+
+    def find(self, page):
+        """
+        Return the index of `page`, or None if it is not in the corpus.
+        """
+        i = bisect_left(self.pages, page)
+        if i == len(self.pages) or self.pages[i] != page:
+            return None
+        return i
+
+    def rank(self, page):
+        """
+        Return the PageRank of `page`; raise KeyError if it is not in the corpus.
+        """
+        i = self.find(page)
+        if i is None:
+            raise KeyError(page)
+        return float(self.ranks[i])
+
+    def top(self, k=TOP):
+        """
+        Return the `k` highest ranked pages as a list of (page, rank) pairs.
+        """
+        return [(self.pages[i], float(self.ranks[i])) for i in self.order[:k].tolist()]
+
+    def links(self, page):
+        """
+        Return the set of pages `page` links to; raise KeyError if it is not in the corpus.
+        """
+        i = self.find(page)
+        if i is None:
+            raise KeyError(page)
+        return {self.pages[j] for j in self.indices[self.indptr[i]:self.indptr[i + 1]].tolist()}
+
+    def graph(self):
+        """
+        Return the stored links as a LinkGraph.
+        """
+        return LinkGraph(list(self.pages), self.indptr, self.indices)
+
+
+class StringTable():
+    """
+    Read-only sequence of strings stored as one UTF-8 byte array
+    and the offsets where each string starts.
+    """
+    def __init__(self, data, offsets):
+        # Memoryviews index and slice much faster than NumPy arrays one item at a time
+        self.data = memoryview(data)
+        self.offsets = memoryview(offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+if __name__ == "__main__":
+    main()